@@ -0,0 +1,89 @@
+# poker/bot_moves.py
+'''
+Runs deferred bot moves on a per-worker thread pool.
+
+make_move applies the player's action, marks the bot's move as pending on the
+session and returns; the bot then plays from the pool, through the same
+manager cache as requests. The pool uses threads rather than processes
+because the live manager and its ReBeL bot stay in this process and are not
+picklable. The client polls bot_move/ until the response appears on the
+session. Any worker can answer the poll, and a worker that finds a move
+pending for longer than BOT_MOVE_TIMEOUT with nobody running it locally
+plays it itself, so a restarted worker cannot leave a table stuck. The
+takeover is claimed on the row by moving bot_move_started forward and bumping
+version, so of several pollers only one takes over, and the original worker,
+if it is merely slow, fails its versioned flush and drops its result.
+'''
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .config import PokerSettings
+from .game_manager import StaleSessionError
+from .manager_cache import manager_cache
+from .models import GameSession
+
+def _play_bot_move(session_id, player):
+    close_old_connections()
+    try:
+        with manager_cache.checkout(session_id, player) as game_manager:
+            return game_manager.process_bot_action()
+    except StaleSessionError:
+        # Another worker wrote the session first; the poll reads its result from the row
+        print(f"[DEBUG] Dropped bot move for session {session_id}: the session changed underneath it")
+        return None
+    finally:
+        close_old_connections()
+
+class BotMoveRunner:
+    def __init__(self, max_workers=PokerSettings.BOT_MOVE_WORKERS, timeout=PokerSettings.BOT_MOVE_TIMEOUT):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bot-move')
+        self._futures = {}  # session_id -> Future of the move running here
+        self._lock = threading.Lock()
+
+    def submit(self, session_id, player):
+        '''
+        Starts the pending bot move of a session unless this worker is already running it.
+        '''
+        session_id = str(session_id)
+        with self._lock:
+            future = self._futures.get(session_id)
+            if future is None or future.done():
+                self._futures[session_id] = self._executor.submit(_play_bot_move, session_id, player)
+
+    def poll(self, session_id, player):
+        '''
+        Returns the finished bot move's response, or {'bot_pending': True} while it runs.
+        Raises GameSession.DoesNotExist like a direct lookup would.
+        '''
+        session_id = str(session_id)
+        with self._lock:
+            future = self._futures.get(session_id)
+            if future is not None and future.done():
+                del self._futures[session_id]
+        if future is not None:
+            if not future.done():
+                return {'bot_pending': True}
+            # Surfaces an error raised by the bot move
+            future.result()
+
+        row = GameSession.objects.filter(session_id=session_id, player=player).values_list('bot_move_started', 'bot_move_result').first()
+        if row is None:
+            raise GameSession.DoesNotExist(f"No game session {session_id} for this player")
+        started, result = row
+        if started is None:
+            return result or {'bot_pending': False}
+        now = timezone.now()
+        if future is None and (now - started).total_seconds() > self.timeout:
+            claimed = GameSession.objects.filter(session_id=session_id, player=player, bot_move_started=started).update(
+                bot_move_started=now, version=F('version') + 1)
+            if claimed:
+                print(f"[DEBUG] Taking over bot move pending since {started} for session {session_id}")
+                self.submit(session_id, player)
+        return {'bot_pending': True}
+
+bot_move_runner = BotMoveRunner()
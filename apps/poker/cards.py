@@ -0,0 +1,83 @@
+# poker/cards.py
+'''
+Integer card encoding shared by the engine, the game manager and the bots.
+
+A card is an int in 0..51 equal to rank * 4 + suit, which is the order of
+eval7.Deck().cards. Strings are only produced at the JSON/display boundary.
+'''
+import random
+import eval7
+
+RANKS = '23456789TJQKA'
+SUITS = 'cdhs'
+NUM_CARDS = 52
+
+# Interned tables, indexed by card int
+CARD_STRINGS = tuple(r + s for r in RANKS for s in SUITS)
+CARDS = tuple(eval7.Card(s) for s in CARD_STRINGS)
+CARD_INDEX = {s: i for i, s in enumerate(CARD_STRINGS)}
+
+def card_rank(card):
+    '''
+    Returns the rank (0 = deuce .. 12 = ace) of an integer card.
+    '''
+    return card >> 2
+
+def card_suit(card):
+    '''
+    Returns the suit (0 = clubs .. 3 = spades) of an integer card.
+    '''
+    return card & 3
+
+def to_int(card):
+    '''
+    Converts a card string (e.g. "As"), an eval7.Card or an int to an int.
+    '''
+    if isinstance(card, int):
+        return card
+    return CARD_INDEX[str(card)]
+
+def to_ints(cards):
+    '''
+    Converts an iterable of cards in any supported form to a list of ints.
+    '''
+    return [to_int(c) for c in cards]
+
+def to_str(card):
+    '''
+    Converts an integer card to its string form.
+    '''
+    return CARD_STRINGS[card]
+
+def to_strs(cards):
+    '''
+    Converts an iterable of integer cards to a list of strings.
+    '''
+    return [CARD_STRINGS[c] for c in cards]
+
+def seeded_deck(seed):
+    '''
+    Returns the 52 card ints in the order dealt for a per-hand seed. The same
+    seed always yields the same deck, so storing the seed is enough to replay a hand.
+    '''
+    deck = list(range(NUM_CARDS))
+    random.Random(seed).shuffle(deck)
+    return deck
+
+def to_eval7(cards):
+    '''
+    Maps integer cards to the shared eval7.Card objects.
+    '''
+    return [CARDS[c] for c in cards]
+
+def evaluate(cards):
+    '''
+    Evaluates a hand of integer cards with eval7.
+    '''
+    return eval7.evaluate([CARDS[c] for c in cards])
+
+def hand_type(value):
+    '''
+    Returns the category name (e.g. "Flush") of an eval7 hand value.
+    '''
+    return eval7.handtype(value)
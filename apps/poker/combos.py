@@ -0,0 +1,52 @@
+# poker/combos.py
+'''
+Indexing of the 1326 two-card combos, for range vectors over private hands.
+
+Combo i is COMBOS[i] = (low card, high card), in colex order of the pair.
+CARD_COMBOS has one row per card marking the combos that hold it, which
+turns blocker masking and card-removal sums over whole ranges into single
+NumPy operations instead of per-combo loops.
+'''
+import numpy as np
+
+from .cards import NUM_CARDS
+
+NUM_COMBOS = NUM_CARDS * (NUM_CARDS - 1) // 2
+
+COMBOS = np.array([(low, high) for high in range(NUM_CARDS) for low in range(high)], dtype=np.intp)
+
+COMBO_INDEX = np.full((NUM_CARDS, NUM_CARDS), -1, dtype=np.intp)
+COMBO_INDEX[COMBOS[:, 0], COMBOS[:, 1]] = np.arange(NUM_COMBOS)
+COMBO_INDEX[COMBOS[:, 1], COMBOS[:, 0]] = np.arange(NUM_COMBOS)
+
+CARD_COMBOS = np.zeros((NUM_CARDS, NUM_COMBOS), dtype=bool)
+CARD_COMBOS[COMBOS[:, 0], np.arange(NUM_COMBOS)] = True
+CARD_COMBOS[COMBOS[:, 1], np.arange(NUM_COMBOS)] = True
+_CARD_COMBO_WEIGHTS = CARD_COMBOS.astype(np.float32)
+
+# COMBO_CONFLICTS[i, j] is set when combos i and j share a card (including i == j)
+COMBO_CONFLICTS = CARD_COMBOS[COMBOS[:, 0]] | CARD_COMBOS[COMBOS[:, 1]]
+
+def combo_index(hole):
+    '''
+    Returns the combo index of two hole cards, in either order.
+    '''
+    return int(COMBO_INDEX[hole[0], hole[1]])
+
+def blocker_mask(cards):
+    '''
+    Returns a boolean vector marking the combos that hold none of the given cards.
+    '''
+    cards = list(cards)
+    if not cards:
+        return np.ones(NUM_COMBOS, dtype=bool)
+    return ~CARD_COMBOS[cards].any(axis=0)
+
+def compatible_mass(weights):
+    '''
+    For every combo, the total weight on the combos that share no card with it.
+    weights is a range vector of shape (NUM_COMBOS,) or a stack of them, (NUM_COMBOS, k).
+    '''
+    card_mass = _CARD_COMBO_WEIGHTS @ weights
+    # Inclusion-exclusion: the combo itself holds both cards, so it was subtracted twice
+    return weights.sum(axis=0) - card_mass[COMBOS[:, 0]] - card_mass[COMBOS[:, 1]] + weights
@@ -4,4 +4,25 @@ class PokerSettings:
     BIG_BLIND = 2
     SMALL_BLIND = 1
     PLAYER_NAME = 'Player'
-    BOT_NAME = 'ReBeL Bot'
\ No newline at end of file
+    BOT_NAME = 'ReBeL Bot'
+    COMPACT_ROUND_STATE = True # slotted states with an action-history array instead of a linked chain
+    SEEDED_DECK = True # store a per-hand seed in game_state and regenerate the deck from it
+    MANAGER_CACHE_SIZE = 256 # live game managers kept per worker process
+    MANAGER_IDLE_SECONDS = 30 * 60 # evict cached managers unused for this long
+    EVENT_LOG = True # append each action to HandAction and rebuild state from HandSnapshot + replay
+    SNAPSHOT_INTERVAL = 8 # actions between periodic snapshots within a hand
+    HAND_RECORDS = True # keep a HandRecord of every completed hand
+    HAND_RECORD_BATCH_SIZE = 200 # buffered hand records written per bulk insert
+    HAND_RECORD_FLUSH_SECONDS = 5.0 # longest a buffered hand record waits for its insert
+    HAND_RECORD_BUFFER_SIZE = 10000 # most hand records buffered; the oldest are dropped beyond this
+    HAND_RECORD_ATTEMPTS = 3 # failed inserts after which a hand record is logged and dropped
+    BOT_ACTION_BUDGET = 0.25 # seconds the bot may refine one decision before it must answer
+    BOT_ACTION_GRACE = 0.25 # seconds past the budget before the decision is abandoned for a check or fold
+    BOT_DECISION_WORKERS = 8 # threads running timed bot decisions per worker process
+    ASYNC_BOT_MOVES = True # make_move returns after the player's action; the bot moves on a thread pool
+    BOT_MOVE_WORKERS = 4 # bot move threads per worker process
+    BOT_MOVE_TIMEOUT = 30 # seconds before another worker takes over a pending bot move
+    SPECULATIVE_BOT = True # precompute the bot's replies to likely human actions while the human thinks
+    SPECULATION_WORKERS = 1 # speculation threads per worker process
+    SPECULATION_BUDGET = 1.0 # CPU seconds spent speculating on one state
+    SPECULATION_SESSIONS = 256 # sessions whose speculated replies are kept per worker process
@@ -0,0 +1,71 @@
+# poker/equity.py
+'''
+Exact equity of a hand against a uniformly random opponent holding.
+
+Every opponent combo and every remaining runout is enumerated and scored
+with the batch evaluator, so the result carries no Monte Carlo noise.
+Results are memoized in a bounded LRU keyed on the suit-canonical form of
+(hole, board) from isomorphism.py, since suit relabelings and board order
+do not change equity.
+'''
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+import numpy as np
+
+from .cards import NUM_CARDS
+from .hand_eval import evaluate_batch
+from .isomorphism import canonicalize
+
+EQUITY_CACHE_SIZE = 100000
+# Runouts scored per evaluator call, bounds temporary memory on the flop
+RUNOUT_CHUNK = 128
+
+def enumeration_cost(board_size):
+    '''
+    Returns the number of 7-card evaluations exact_equity needs for a board of this size.
+    '''
+    live = NUM_CARDS - 2 - board_size
+    return comb(live, 5 - board_size) * (comb(live, 2) + 1)
+
+def exact_equity(hole, board=()):
+    '''
+    Returns (wins + 0.5 * ties) / total for hole against every opponent combo
+    and every runout of the remaining board cards.
+
+    Arguments:
+    hole: our two hole cards.
+    board: 0, 3, 4 or 5 visible community cards. Preflop enumeration is far too
+           large to be practical; see enumeration_cost.
+    '''
+    # Board order does not matter here, so the whole board is one canonical group
+    return _cached_equity(*canonicalize([hole, board]))
+
+@lru_cache(maxsize=EQUITY_CACHE_SIZE)
+def _cached_equity(hole, board):
+    dead = set(hole) | set(board)
+    live = np.array([card for card in range(NUM_CARDS) if card not in dead], dtype=np.intp)
+    runout_size = 5 - len(board)
+    runouts = np.array(list(combinations(live, runout_size)), dtype=np.intp).reshape(comb(len(live), runout_size), runout_size)
+    pairs = np.array(list(combinations(live, 2)), dtype=np.intp)
+    known = np.array(board, dtype=np.intp)
+
+    score = 0
+    total = 0
+    for start in range(0, len(runouts), RUNOUT_CHUNK):
+        chunk = runouts[start:start + RUNOUT_CHUNK]
+        boards = np.hstack([np.broadcast_to(known, (len(chunk), len(known))), chunk])
+        our_values = evaluate_batch(np.hstack([np.broadcast_to(np.array(hole), (len(chunk), 2)), boards]))
+
+        # Every (runout, opponent pair) combination; pairs that reuse a runout card are masked out
+        opp_hands = np.concatenate([
+            np.repeat(boards, len(pairs), axis=0),
+            np.tile(pairs, (len(chunk), 1)),
+        ], axis=1)
+        opp_values = evaluate_batch(opp_hands).reshape(len(chunk), len(pairs))
+        valid = ~(chunk[:, :, None, None] == pairs[None, None, :, :]).any(axis=(1, 3))
+
+        ours = our_values[:, None]
+        score += 2 * np.count_nonzero((ours > opp_values) & valid) + np.count_nonzero((ours == opp_values) & valid)
+        total += np.count_nonzero(valid)
+    return score / (2 * total)
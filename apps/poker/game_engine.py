@@ -1,6 +1,11 @@
 # poker/game_engine.py
+from array import array
 from collections import namedtuple
 import eval7
+import numpy as np
+from .cards import CARDS, NUM_CARDS, evaluate
+from .hand_eval import evaluate_batch
+from .zobrist import root_hash, step_hash, street_hash, private_hash, action_key, stack_key
 
 # Game constants
 SMALL_BLIND = 1
@@ -15,16 +20,107 @@ CheckAction = namedtuple('CheckAction', [])
 RaiseAction = namedtuple('RaiseAction', ['amount'])
 TerminalState = namedtuple('TerminalState', ['deltas', 'previous_state'])
 
+# Integer action codes: the kind sits in the low two bits, a raise keeps its
+# amount above them. Legal actions are a bitmask with bit (1 << kind) per kind.
+FOLD_CODE, CALL_CODE, CHECK_CODE, RAISE_CODE = range(4)
+FOLD_BIT, CALL_BIT, CHECK_BIT, RAISE_BIT = (1 << code for code in range(4))
+
+# Conversion tables indexed by action kind
+ACTION_TYPES = (FoldAction, CallAction, CheckAction, RaiseAction)
+ACTION_CODES = {action_type: code for code, action_type in enumerate(ACTION_TYPES)}
+ACTION_NAMES = ('fold', 'call', 'check', 'raise')  # UI and API strings
+ACTION_LETTERS = ('F', 'C', 'K', 'R')  # engine protocol
+ACTION_VERBS = ('folds', 'calls', 'checks', 'raises to')
+_SIMPLE_ACTIONS = (FoldAction(), CallAction(), CheckAction())
+
+# Per legal mask, shared so legal_actions never allocates
+LEGAL_ACTION_SETS = tuple(frozenset(ACTION_TYPES[code] for code in range(4) if mask >> code & 1) for mask in range(16))
+LEGAL_ACTION_NAMES = tuple(tuple(ACTION_NAMES[code] for code in range(4) if mask >> code & 1) for mask in range(16))
+
+def legal_action_mask(button, pips, stacks):
+    '''
+    Returns the bitmask of the active player's legal action kinds.
+    '''
+    active = button % 2
+    continue_cost = pips[1-active] - pips[active]
+    if continue_cost == 0:
+        bets_forbidden = (stacks[0] == 0 or stacks[1] == 0)
+        return CHECK_BIT if bets_forbidden else CHECK_BIT | RAISE_BIT
+    raises_forbidden = (continue_cost == stacks[active] or stacks[1-active] == 0)
+    return FOLD_BIT | CALL_BIT if raises_forbidden else FOLD_BIT | CALL_BIT | RAISE_BIT
+
+def encode_action(action):
+    '''
+    Packs an action into a small int.
+    '''
+    kind = ACTION_CODES.get(type(action))
+    if kind is None:
+        raise ValueError(f"Unknown action type: {action}")
+    if kind == RAISE_CODE:
+        return (action.amount << 2) | RAISE_CODE
+    return kind
+
+def decode_action(code):
+    '''
+    Unpacks an int from encode_action back into an action.
+    '''
+    kind = code & 3
+    if kind == RAISE_CODE:
+        return RaiseAction(code >> 2)
+    return _SIMPLE_ACTIONS[kind]
+
+def action_name(action):
+    '''
+    Returns the UI name of an action or action type, e.g. "raise".
+    '''
+    action_type = action if isinstance(action, type) else type(action)
+    return ACTION_NAMES[ACTION_CODES[action_type]]
+
+def action_letters(action):
+    '''
+    Encodes an action in the engine protocol, e.g. "K" or "R20".
+    '''
+    code = encode_action(action)
+    if code & 3 == RAISE_CODE:
+        return ACTION_LETTERS[RAISE_CODE] + str(code >> 2)
+    return ACTION_LETTERS[code]
+
+def action_message(action):
+    '''
+    Describes an action for the game log, e.g. "checks" or "raises to 20".
+    '''
+    code = encode_action(action)
+    if code & 3 == RAISE_CODE:
+        return f"{ACTION_VERBS[RAISE_CODE]} {code >> 2}"
+    return ACTION_VERBS[code]
+
 # Helper functions
 CCARDS = lambda cards: ','.join(map(str, cards))
 PCARDS = lambda cards: '[{}]'.format(' '.join(map(str, cards)))
 PVALUE = lambda name, value: ', {} ({})'.format(name, value)
 STATUS = lambda players: ''.join([PVALUE(p.name, p.bankroll) for p in players])
 
-class RoundState(namedtuple('_RoundState', ['button', 'street', 'final_street', 'pips', 'stacks', 'hands', 'deck', 'previous_state'])):
+class RoundState(namedtuple('_RoundState', ['button', 'street', 'final_street', 'pips', 'stacks', 'hands', 'deck', 'previous_state', 'outcome', 'zobrist'], defaults=(None, None))):
     '''
     Encodes the game tree for one round of poker.
+
+    outcome optionally holds the precomputed showdown result for the full board:
+    1 if hands[0] wins, -1 if hands[1] wins, 0 for a split.
+
+    zobrist is the 64-bit hash of the public state (see zobrist.py). It is
+    computed from scratch when a hand starts and updated per action after that.
     '''
+    def __new__(cls, button, street, final_street, pips, stacks, hands, deck, previous_state, outcome=None, zobrist=None):
+        if zobrist is None:
+            zobrist = root_hash(button, street, stacks, deck[:street])
+        return super().__new__(cls, button, street, final_street, pips, stacks, hands, deck, previous_state, outcome, zobrist)
+
+    def private_hash(self, player=None):
+        '''
+        Returns the hash with one player's hole cards (or both) mixed in.
+        '''
+        return private_hash(self.zobrist, self.hands, player)
+
     # def showdown(self):
     #     '''
     #     Compares the players' hands and computes payoffs.
@@ -42,33 +138,43 @@ class RoundState(namedtuple('_RoundState', ['button', 'street', 'final_street',
         '''
         Compares the players' hands and computes payoffs.
         '''
-        # Convert string cards back to eval7 Card objects for evaluation
-        board_cards = [eval7.Card(card) for card in self.deck[:self.final_street]]
-        hand0 = [eval7.Card(card) for card in self.hands[0]]
-        hand1 = [eval7.Card(card) for card in self.hands[1]]
+        if self.outcome is not None:
+            delta = self._showdown_delta(self.outcome)
+            return TerminalState([delta, -delta], self)
+
+        # Cards are ints, so look up the interned eval7 Card objects
+        board_cards = [CARDS[card] for card in self.deck[:self.final_street]]
+        hand0 = [CARDS[card] for card in self.hands[0]]
+        hand1 = [CARDS[card] for card in self.hands[1]]
         
         score0 = eval7.evaluate(board_cards + hand0)
         score1 = eval7.evaluate(board_cards + hand1)
         
-        if score0 > score1:
-            delta = STARTING_STACK - self.stacks[1]
-        elif score0 < score1:
-            delta = self.stacks[0] - STARTING_STACK
-        else:  # split the pot
-            delta = (self.stacks[0] - self.stacks[1]) // 2
+        delta = self._showdown_delta((score0 > score1) - (score0 < score1))
         return TerminalState([delta, -delta], self)
 
+    def _showdown_delta(self, outcome):
+        '''
+        Returns player 0's payoff for a showdown outcome of 1, -1 or 0.
+        '''
+        if outcome > 0:
+            return STARTING_STACK - self.stacks[1]
+        elif outcome < 0:
+            return self.stacks[0] - STARTING_STACK
+        # split the pot
+        return (self.stacks[0] - self.stacks[1]) // 2
+
+    def legal_mask(self):
+        '''
+        Returns the active player's legal moves as a bitmask of action kinds.
+        '''
+        return legal_action_mask(self.button, self.pips, self.stacks)
+
     def legal_actions(self):
         '''
         Returns a set which corresponds to the active player's legal moves.
         '''
-        active = self.button % 2
-        continue_cost = self.pips[1-active] - self.pips[active]
-        if continue_cost == 0:
-            bets_forbidden = (self.stacks[0] == 0 or self.stacks[1] == 0)
-            return {CheckAction} if bets_forbidden else {CheckAction, RaiseAction}
-        raises_forbidden = (continue_cost == self.stacks[active] or self.stacks[1-active] == 0)
-        return {FoldAction, CallAction} if raises_forbidden else {FoldAction, CallAction, RaiseAction}
+        return LEGAL_ACTION_SETS[legal_action_mask(self.button, self.pips, self.stacks)]
 
     def raise_bounds(self):
         '''
@@ -84,10 +190,14 @@ class RoundState(namedtuple('_RoundState', ['button', 'street', 'final_street',
         '''
         Resets the players' pips and advances the game tree to the next round of betting.
         '''
+        return self._advance_street(self.zobrist)
+
+    def _advance_street(self, zobrist):
         if self.street == self.final_street:
             return self.showdown()
         new_street = 3 if self.street == 0 else self.street + 1
-        return RoundState(1, new_street, self.final_street, [0, 0], self.stacks, self.hands, self.deck, self)
+        zobrist = street_hash(zobrist, self.street, new_street, self.deck)
+        return RoundState(1, new_street, self.final_street, [0, 0], self.stacks, self.hands, self.deck, self, self.outcome, zobrist)
 
     def proceed(self, action):
         active = self.button % 2
@@ -108,7 +218,10 @@ class RoundState(namedtuple('_RoundState', ['button', 'street', 'final_street',
                     stacks=[STARTING_STACK - BIG_BLIND] * 2,
                     hands=self.hands,
                     deck=self.deck,
-                    previous_state=self
+                    previous_state=self,
+                    outcome=self.outcome,
+                    zobrist=step_hash(self.zobrist, self.street, self.button, CALL_CODE,
+                                      self.stacks, [STARTING_STACK - BIG_BLIND] * 2)
                 )
             new_pips = list(self.pips)
             new_stacks = list(self.stacks)
@@ -124,13 +237,16 @@ class RoundState(namedtuple('_RoundState', ['button', 'street', 'final_street',
                 stacks=new_stacks,
                 hands=self.hands,
                 deck=self.deck,
-                previous_state=self
+                previous_state=self,
+                outcome=self.outcome,
+                zobrist=step_hash(self.zobrist, self.street, self.button, CALL_CODE, self.stacks, new_stacks)
             )
             return state.proceed_street()
         
         elif isinstance(action, CheckAction):
+            zobrist = step_hash(self.zobrist, self.street, self.button, CHECK_CODE, self.stacks, self.stacks)
             if (self.street == 0 and self.button > 0) or self.button > 1:
-                return self.proceed_street()
+                return self._advance_street(zobrist)
             return RoundState(
                 button=self.button + 1,
                 street=self.street,
@@ -139,7 +255,9 @@ class RoundState(namedtuple('_RoundState', ['button', 'street', 'final_street',
                 stacks=self.stacks,
                 hands=self.hands,
                 deck=self.deck,
-                previous_state=self
+                previous_state=self,
+                outcome=self.outcome,
+                zobrist=zobrist
             )
         
         elif isinstance(action, RaiseAction):
@@ -156,7 +274,9 @@ class RoundState(namedtuple('_RoundState', ['button', 'street', 'final_street',
                 stacks=new_stacks,
                 hands=self.hands,
                 deck=self.deck,
-                previous_state=self
+                previous_state=self,
+                outcome=self.outcome,
+                zobrist=step_hash(self.zobrist, self.street, self.button, encode_action(action), self.stacks, new_stacks)
             )
 
         else:
@@ -164,6 +284,496 @@ class RoundState(namedtuple('_RoundState', ['button', 'street', 'final_street',
             raise ValueError(f"Unknown action type: {action}")
 
 
+class CompactRoundState:
+    '''
+    Memory-lean counterpart of RoundState with the same legal_actions, raise_bounds,
+    proceed and showdown API.
+
+    States do not link to their parent. Each one holds pips and stacks as tuples,
+    references the hand's shared hands and deck lists, and records the hand's
+    actions as an int array of action codes. previous_state is rebuilt on demand
+    by replaying that history from the hand's first state. zobrist is maintained
+    exactly as on RoundState.
+    '''
+    __slots__ = ('button', 'street', 'final_street', '_pips', '_stacks', 'hands', 'deck', 'outcome', 'history', 'zobrist', '_origin')
+
+    def __init__(self, button, street, final_street, pips, stacks, hands, deck, outcome=None, history=None, origin=None, zobrist=None):
+        self.button = button
+        self.street = street
+        self.final_street = final_street
+        self._pips = tuple(pips)
+        self._stacks = tuple(stacks)
+        self.hands = hands
+        self.deck = deck
+        self.outcome = outcome
+        self.history = array('h') if history is None else history
+        self.zobrist = root_hash(button, street, stacks, deck[:street]) if zobrist is None else zobrist
+        # (button, street, pips, stacks, zobrist) of the hand's first state, shared by every descendant
+        self._origin = (button, street, self._pips, self._stacks, self.zobrist) if origin is None else origin
+
+    def _child(self, button, street, pips, stacks, history, zobrist):
+        state = object.__new__(CompactRoundState)
+        state.button = button
+        state.street = street
+        state.final_street = self.final_street
+        state._pips = pips
+        state._stacks = stacks
+        state.hands = self.hands
+        state.deck = self.deck
+        state.outcome = self.outcome
+        state.history = history
+        state.zobrist = zobrist
+        state._origin = self._origin
+        return state
+
+    def private_hash(self, player=None):
+        '''
+        Returns the hash with one player's hole cards (or both) mixed in.
+        '''
+        return private_hash(self.zobrist, self.hands, player)
+
+    @property
+    def pips(self):
+        return list(self._pips)
+
+    @property
+    def stacks(self):
+        return list(self._stacks)
+
+    @property
+    def previous_state(self):
+        '''
+        Rebuilds the state before the last action, or None at the start of the hand.
+        '''
+        if not self.history:
+            return None
+        state = self.initial_state()
+        for code in self.history[:-1]:
+            state = state.proceed_code(code)
+        return state
+
+    def initial_state(self):
+        '''
+        Returns the first state of this hand.
+        '''
+        button, street, pips, stacks, zobrist = self._origin
+        return self._child(button, street, pips, stacks, array('h'), zobrist)
+
+    # Both only read outcome, deck, hands and stacks, so they are shared with RoundState
+    showdown = RoundState.showdown
+    _showdown_delta = RoundState._showdown_delta
+
+    def legal_mask(self):
+        '''
+        Returns the active player's legal moves as a bitmask of action kinds.
+        '''
+        return legal_action_mask(self.button, self._pips, self._stacks)
+
+    def legal_actions(self):
+        '''
+        Returns a set which corresponds to the active player's legal moves.
+        '''
+        return LEGAL_ACTION_SETS[legal_action_mask(self.button, self._pips, self._stacks)]
+
+    def raise_bounds(self):
+        '''
+        Returns a tuple of the minimum and maximum legal raises.
+        '''
+        active = self.button % 2
+        pips, stacks = self._pips, self._stacks
+        continue_cost = pips[1-active] - pips[active]
+        max_contribution = min(stacks[active], stacks[1-active] + continue_cost)
+        min_contribution = min(max_contribution, continue_cost + max(continue_cost, BIG_BLIND))
+        return (pips[active] + min_contribution, pips[active] + max_contribution)
+
+    def proceed_street(self):
+        '''
+        Resets the players' pips and advances the game tree to the next round of betting.
+        '''
+        return self._proceed_street(self.history, self.zobrist)
+
+    def _proceed_street(self, history, zobrist):
+        if self.street == self.final_street:
+            return self.showdown()
+        new_street = 3 if self.street == 0 else self.street + 1
+        zobrist = street_hash(zobrist, self.street, new_street, self.deck)
+        return self._child(1, new_street, (0, 0), self._stacks, history, zobrist)
+
+    def proceed(self, action):
+        return self.proceed_code(encode_action(action))
+
+    def proceed_code(self, code):
+        '''
+        Same as proceed, for an action already packed by encode_action.
+        '''
+        active = self.button % 2
+        kind = code & 3
+        history = self.history + array('h', (code,))
+
+        if kind == FOLD_CODE:
+            delta = (self._stacks[0] - STARTING_STACK
+                    if active == 0 else STARTING_STACK - self._stacks[1])
+            return TerminalState([delta, -delta], self)
+
+        elif kind == CALL_CODE:
+            if self.button == 0:
+                # sb calls bb
+                stacks = (STARTING_STACK - BIG_BLIND,) * 2
+                zobrist = step_hash(self.zobrist, self.street, self.button, code, self._stacks, stacks)
+                return self._child(1, 0, (BIG_BLIND, BIG_BLIND), stacks, history, zobrist)
+            pips = list(self._pips)
+            stacks = list(self._stacks)
+            contribution = pips[1 - active] - pips[active]
+            stacks[active] -= contribution
+            pips[active] += contribution
+            zobrist = step_hash(self.zobrist, self.street, self.button, code, self._stacks, stacks)
+            state = self._child(self.button + 1, self.street, tuple(pips), tuple(stacks), history, zobrist)
+            return state.proceed_street()
+
+        elif kind == CHECK_CODE:
+            zobrist = step_hash(self.zobrist, self.street, self.button, code, self._stacks, self._stacks)
+            if (self.street == 0 and self.button > 0) or self.button > 1:
+                return self._proceed_street(history, zobrist)
+            return self._child(self.button + 1, self.street, self._pips, self._stacks, history, zobrist)
+
+        # raise
+        pips = list(self._pips)
+        stacks = list(self._stacks)
+        contribution = (code >> 2) - pips[active]
+        stacks[active] -= contribution
+        pips[active] += contribution
+        zobrist = step_hash(self.zobrist, self.street, self.button, code, self._stacks, stacks)
+        return self._child(self.button + 1, self.street, tuple(pips), tuple(stacks), history, zobrist)
+
+# Saved per SearchState.apply: button, street, two pips, two stacks and the terminal flag
+_FRAME_SIZE = 7
+
+class SearchState:
+    '''
+    Mutable single-hand state for tree search, equivalent to stepping RoundState with proceed.
+
+    apply() changes the state in place and pushes what it overwrote onto a
+    fixed-capacity stack, and undo() pops it back, so walking a game tree
+    depth-first allocates nothing per edge. Once a fold or showdown ends the
+    hand, terminal is True and deltas holds the payoffs. zobrist is maintained
+    exactly as on RoundState and restored by undo().
+    '''
+    __slots__ = ('button', 'street', 'final_street', 'pips', 'stacks', 'hands', 'deck', 'outcome', 'zobrist',
+                 'terminal', 'deltas', 'depth', 'capacity', '_frames', '_codes', '_hashes')
+
+    def __init__(self, button, street, final_street, pips, stacks, hands, deck, outcome=None, capacity=64, zobrist=None):
+        self.button = button
+        self.street = street
+        self.final_street = final_street
+        self.pips = list(pips)
+        self.stacks = list(stacks)
+        self.hands = hands
+        self.deck = deck
+        if outcome is None:
+            board = list(deck[:final_street])
+            score0 = evaluate(list(hands[0]) + board)
+            score1 = evaluate(list(hands[1]) + board)
+            outcome = (score0 > score1) - (score0 < score1)
+        self.outcome = outcome
+        self.zobrist = root_hash(button, street, stacks, deck[:street]) if zobrist is None else zobrist
+        self.terminal = False
+        self.deltas = [0, 0]
+        self.depth = 0
+        self.capacity = capacity
+        self._frames = array('i', bytes(4 * _FRAME_SIZE * capacity))
+        self._codes = array('h', bytes(2 * capacity))
+        self._hashes = array('Q', bytes(8 * capacity))
+
+    @classmethod
+    def from_state(cls, round_state, capacity=64):
+        '''
+        Starts a search from a RoundState or CompactRoundState.
+        '''
+        return cls(round_state.button, round_state.street, round_state.final_street, round_state.pips,
+                   round_state.stacks, round_state.hands, round_state.deck, round_state.outcome, capacity,
+                   round_state.zobrist)
+
+    @property
+    def history(self):
+        '''
+        Returns the action codes applied so far.
+        '''
+        return self._codes[:self.depth]
+
+    def legal_mask(self):
+        '''
+        Returns the active player's legal moves as a bitmask of action kinds, 0 once terminal.
+        '''
+        if self.terminal:
+            return 0
+        return legal_action_mask(self.button, self.pips, self.stacks)
+
+    def legal_actions(self):
+        '''
+        Returns a set which corresponds to the active player's legal moves.
+        '''
+        return LEGAL_ACTION_SETS[self.legal_mask()]
+
+    def raise_bounds(self):
+        '''
+        Returns a tuple of the minimum and maximum legal raises.
+        '''
+        return RoundState.raise_bounds(self)
+
+    def apply(self, action):
+        self.apply_code(encode_action(action))
+
+    def apply_code(self, code):
+        '''
+        Same as apply, for an action already packed by encode_action.
+        '''
+        if self.depth == self.capacity:
+            raise IndexError("SearchState action stack is full")
+        pips, stacks = self.pips, self.stacks
+        frame = self.depth * _FRAME_SIZE
+        frames = self._frames
+        frames[frame] = self.button
+        frames[frame + 1] = self.street
+        frames[frame + 2] = pips[0]
+        frames[frame + 3] = pips[1]
+        frames[frame + 4] = stacks[0]
+        frames[frame + 5] = stacks[1]
+        frames[frame + 6] = self.terminal
+        self._codes[self.depth] = code
+        self._hashes[self.depth] = self.zobrist
+        self.depth += 1
+        stack0, stack1 = stacks
+        self.zobrist ^= action_key(self.street, self.button, code)
+        self._apply(code)
+        if stacks[0] != stack0:
+            self.zobrist ^= stack_key(0, stack0) ^ stack_key(0, stacks[0])
+        if stacks[1] != stack1:
+            self.zobrist ^= stack_key(1, stack1) ^ stack_key(1, stacks[1])
+
+    def _apply(self, code):
+        pips, stacks = self.pips, self.stacks
+        active = self.button % 2
+        kind = code & 3
+        if kind == FOLD_CODE:
+            delta = stacks[0] - STARTING_STACK if active == 0 else STARTING_STACK - stacks[1]
+            self._finish(delta)
+        elif kind == CALL_CODE:
+            if self.button == 0:
+                # sb calls bb
+                self.button = 1
+                pips[0] = pips[1] = BIG_BLIND
+                stacks[0] = stacks[1] = STARTING_STACK - BIG_BLIND
+                return
+            contribution = pips[1 - active] - pips[active]
+            stacks[active] -= contribution
+            pips[active] += contribution
+            self.button += 1
+            self._proceed_street()
+        elif kind == CHECK_CODE:
+            if (self.street == 0 and self.button > 0) or self.button > 1:
+                self._proceed_street()
+            else:
+                self.button += 1
+        else:
+            contribution = (code >> 2) - pips[active]
+            stacks[active] -= contribution
+            pips[active] += contribution
+            self.button += 1
+
+    def undo(self):
+        '''
+        Reverts the last apply and returns its action code.
+        '''
+        self.depth -= 1
+        frame = self.depth * _FRAME_SIZE
+        frames = self._frames
+        self.button = frames[frame]
+        self.street = frames[frame + 1]
+        self.pips[0] = frames[frame + 2]
+        self.pips[1] = frames[frame + 3]
+        self.stacks[0] = frames[frame + 4]
+        self.stacks[1] = frames[frame + 5]
+        self.terminal = bool(frames[frame + 6])
+        self.zobrist = self._hashes[self.depth]
+        return self._codes[self.depth]
+
+    def _proceed_street(self):
+        if self.street == self.final_street:
+            stacks = self.stacks
+            if self.outcome > 0:
+                delta = STARTING_STACK - stacks[1]
+            elif self.outcome < 0:
+                delta = stacks[0] - STARTING_STACK
+            else:  # split the pot
+                delta = (stacks[0] - stacks[1]) // 2
+            self._finish(delta)
+            return
+        new_street = 3 if self.street == 0 else self.street + 1
+        self.zobrist = street_hash(self.zobrist, self.street, new_street, self.deck)
+        self.street = new_street
+        self.button = 1
+        self.pips[0] = self.pips[1] = 0
+
+    def _finish(self, delta):
+        self.terminal = True
+        self.deltas[0] = delta
+        self.deltas[1] = -delta
+
+
+class VecRoundState:
+    '''
+    Steps B independent heads-up hands at once, following RoundState's rules row by row.
+
+    button, street and done are (B,) arrays, pips and stacks (B, 2), hands (B, 2, 2)
+    and deck (B, k) int cards with the board first. Actions are given per row as
+    action kinds (FOLD_CODE .. RAISE_CODE) plus raise amounts. Finished rows keep
+    their deltas and ignore further actions. States are immutable like RoundState:
+    proceed returns a new VecRoundState.
+    '''
+    def __init__(self, button, street, pips, stacks, hands, deck, final_street=5, outcome=None, done=None, deltas=None):
+        self.button = np.asarray(button, dtype=np.int32)
+        self.street = np.asarray(street, dtype=np.int32)
+        self.pips = np.asarray(pips, dtype=np.int32)
+        self.stacks = np.asarray(stacks, dtype=np.int32)
+        self.hands = np.asarray(hands, dtype=np.int8)
+        self.deck = np.asarray(deck, dtype=np.int8)
+        self.final_street = final_street
+        batch = len(self.button)
+        if outcome is None:
+            # Showdowns are settled up front: 1 if hands[:, 0] wins, -1 if hands[:, 1] wins, 0 for a split
+            board = self.deck[:, :final_street]
+            score0 = evaluate_batch(np.hstack([self.hands[:, 0], board]))
+            score1 = evaluate_batch(np.hstack([self.hands[:, 1], board]))
+            outcome = np.sign(score0 - score1)
+        self.outcome = np.asarray(outcome, dtype=np.int8)
+        self.done = np.zeros(batch, dtype=bool) if done is None else done
+        self.deltas = np.zeros((batch, 2), dtype=np.int32) if deltas is None else deltas
+
+    @classmethod
+    def deal(cls, batch, rng=None):
+        '''
+        Deals B fresh hands with player 0 on the button posting the small blind.
+        '''
+        rng = np.random.default_rng(rng)
+        decks = np.argsort(rng.random((batch, NUM_CARDS), dtype=np.float32), axis=1)
+        return cls(
+            button=np.zeros(batch),
+            street=np.zeros(batch),
+            pips=np.broadcast_to([SMALL_BLIND, BIG_BLIND], (batch, 2)),
+            stacks=np.broadcast_to([STARTING_STACK - SMALL_BLIND, STARTING_STACK - BIG_BLIND], (batch, 2)),
+            hands=decks[:, :4].reshape(batch, 2, 2),
+            deck=decks[:, 4:],
+        )
+
+    def __len__(self):
+        return len(self.button)
+
+    def row(self, index):
+        '''
+        Returns hand index as a RoundState, or its deltas as a TerminalState once finished.
+        '''
+        state = RoundState(int(self.button[index]), int(self.street[index]), self.final_street,
+                           self.pips[index].tolist(), self.stacks[index].tolist(),
+                           self.hands[index].tolist(), self.deck[index].tolist(), None, int(self.outcome[index]))
+        if self.done[index]:
+            return TerminalState(self.deltas[index].tolist(), state)
+        return state
+
+    def _active_columns(self):
+        rows = np.arange(len(self.button))
+        active = self.button % 2
+        return rows, active, 1 - active
+
+    def legal_mask(self):
+        '''
+        Returns each row's legal action bitmask (see legal_action_mask), 0 for finished rows.
+        '''
+        rows, active, other = self._active_columns()
+        continue_cost = self.pips[rows, other] - self.pips[rows, active]
+        anyone_all_in = (self.stacks == 0).any(axis=1)
+        raise_bit = np.where(continue_cost == 0, ~anyone_all_in,
+                             (continue_cost != self.stacks[rows, active]) & (self.stacks[rows, other] != 0))
+        mask = np.where(continue_cost == 0, CHECK_BIT, FOLD_BIT | CALL_BIT) | np.where(raise_bit, RAISE_BIT, 0)
+        return np.where(self.done, 0, mask).astype(np.int8)
+
+    def legal_actions(self):
+        '''
+        Returns a (B, 4) bool array of legal moves, indexed by action kind.
+        '''
+        return (self.legal_mask()[:, None] >> np.arange(4)) & 1 == 1
+
+    def raise_bounds(self):
+        '''
+        Returns arrays of the minimum and maximum legal raises.
+        '''
+        rows, active, other = self._active_columns()
+        continue_cost = self.pips[rows, other] - self.pips[rows, active]
+        max_contribution = np.minimum(self.stacks[rows, active], self.stacks[rows, other] + continue_cost)
+        min_contribution = np.minimum(max_contribution, continue_cost + np.maximum(continue_cost, BIG_BLIND))
+        return (self.pips[rows, active] + min_contribution, self.pips[rows, active] + max_contribution)
+
+    def proceed(self, kinds, amounts=0):
+        '''
+        Applies one action per row and returns the resulting VecRoundState.
+
+        Arguments:
+        kinds: (B,) action kinds, or one kind for every row.
+        amounts: (B,) raise-to amounts, read only for rows that raise.
+        '''
+        batch = len(self.button)
+        kinds = np.broadcast_to(kinds, (batch,))
+        amounts = np.broadcast_to(amounts, (batch,))
+        rows, active, other = self._active_columns()
+        live = ~self.done
+        button = self.button.copy()
+        street = self.street.copy()
+        pips = self.pips.copy()
+        stacks = self.stacks.copy()
+        done = self.done.copy()
+        deltas = self.deltas.copy()
+
+        fold = live & (kinds == FOLD_CODE)
+        call = live & (kinds == CALL_CODE)
+        check = live & (kinds == CHECK_CODE)
+        raises = live & (kinds == RAISE_CODE)
+
+        fold_delta = np.where(active == 0, stacks[:, 0] - STARTING_STACK, STARTING_STACK - stacks[:, 1])
+        deltas[fold] = np.stack([fold_delta, -fold_delta], axis=1)[fold]
+        done |= fold
+
+        # sb calls bb
+        limp = call & (button == 0)
+        call &= ~limp
+        button[limp] = 1
+        pips[limp] = BIG_BLIND
+        stacks[limp] = STARTING_STACK - BIG_BLIND
+
+        # Calls and raises move chips from the active stack into its pip
+        pays = call | raises
+        target = np.where(raises, amounts, pips[rows, other])
+        contribution = np.where(pays, target - pips[rows, active], 0)
+        stacks[rows, active] -= contribution
+        pips[rows, active] += contribution
+
+        closes_street = call | (check & (((street == 0) & (button > 0)) | (button > 1)))
+        button[pays | (check & ~closes_street)] += 1
+
+        showdown = closes_street & (street == self.final_street)
+        outcome = self.outcome
+        showdown_delta = np.where(outcome > 0, STARTING_STACK - stacks[:, 1],
+                                  np.where(outcome < 0, stacks[:, 0] - STARTING_STACK, (stacks[:, 0] - stacks[:, 1]) // 2))
+        deltas[showdown] = np.stack([showdown_delta, -showdown_delta], axis=1)[showdown]
+        done |= showdown
+
+        advance = closes_street & ~showdown
+        street[advance] = np.where(street[advance] == 0, 3, street[advance] + 1)
+        button[advance] = 1
+        pips[advance] = 0
+
+        return VecRoundState(button, street, pips, stacks, self.hands, self.deck,
+                             self.final_street, outcome, done, deltas)
+
+
 class GameState:
     '''
     Encodes the state of a multi-round poker game.
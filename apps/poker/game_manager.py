@@ -1,35 +1,125 @@
 # poker/game_manager.py
 from .config import PokerSettings
-from .game_engine import RoundState, FoldAction, CallAction, CheckAction, RaiseAction, TerminalState
-import eval7
+from .game_engine import RoundState, CompactRoundState, FoldAction, CallAction, CheckAction, RaiseAction, TerminalState
+from .game_engine import ACTION_CODES, ACTION_NAMES, LEGAL_ACTION_NAMES, action_message, encode_action, decode_action
+from .cards import NUM_CARDS, CARD_STRINGS, to_ints, to_strs, evaluate, hand_type, seeded_deck
+import copy
+import logging
+import random
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from .models import GameSession, HandAction, HandSnapshot, HandRecord
+from .hand_records import hand_record_writer
+from .speculation import bot_speculator
+from .state_codec import encode_game_state, encode_hand_actions
 from .rebel.player import ReBeL
 
+logger = logging.getLogger(__name__)
+
+# Runs timed bot decisions, so a request can stop waiting on one that overruns its deadline
+decision_executor = ThreadPoolExecutor(max_workers=PokerSettings.BOT_DECISION_WORKERS, thread_name_prefix='bot-decision')
+pending_decisions = set()  # futures submitted to decision_executor and not yet finished
+
+def _decide(bot, game_state, round_state, budget, give_up, cancelled):
+    """Run one timed decision; its budget counts from when a decision thread picks it up"""
+    deadline = min(time.monotonic() + budget, give_up)
+    return bot.get_action_by(game_state, round_state, 1, deadline, cancelled)
+
+class StaleSessionError(Exception):
+    """Raised by flush when another manager wrote the session since this one loaded it"""
+
 class PokerGameManager:
     def __init__(self, session):
         self.session = session
         self.player = session.player
-        self.deck = eval7.Deck()
+        self.deck = list(range(NUM_CARDS))
+        self.deck_seed = None
         self.settings = PokerSettings()
         self.rebel_bot = ReBeL()
         self.buy_in_amount = 200
         self.total_pot = 0
         self.player_total_bet = 0 
         self.bot_total_bet = 0
+        self.hand_types = []
+        self.round_state_class = CompactRoundState if self.settings.COMPACT_ROUND_STATE else RoundState
+        # Unit of work: session columns are diffed against this snapshot and written once by flush()
+        self._session_snapshot = self._session_values()
+        self._dirty_player_fields = set()
+        # (actor, action code) of every action in the current hand, None when only part of it is known
+        self.hand_actions = []
+        # [player, bot] stacks before the current hand's blinds
+        self.hand_start_stacks = None
+        # Hand log rows waiting for the next flush
+        self._pending_actions = []
+        self._pending_snapshot = None
+        self._hand_has_snapshot = False
+
+    def reload(self, session):
+        """Swap in a freshly loaded session row, keeping the bot and its learned state"""
+        self.session = session
+        self.player = session.player
+        self._session_snapshot = self._session_values()
+        self._dirty_player_fields = set()
+        self._pending_actions = []
+        self._pending_snapshot = None
+        self._hand_has_snapshot = False
+        return self
+
+    def _session_values(self):
+        """Copy the session's column values, keyed by field name"""
+        values = {}
+        for field in self.session._meta.concrete_fields:
+            if field.primary_key:
+                continue
+            value = getattr(self.session, field.attname)
+            if isinstance(value, memoryview):
+                value = bytes(value)
+            values[field.name] = copy.deepcopy(value) if isinstance(value, (list, dict)) else value
+        return values
+
+    def flush(self):
+        """
+        Write this request's session and player changes in one transaction, limited to the changed columns.
+        The session row is only written if it still holds the version this manager loaded; otherwise
+        nothing is written and StaleSessionError is raised.
+        """
+        values = self._session_values()
+        changed = [name for name, value in values.items() if self._session_snapshot.get(name) != value]
+        if not changed and not self._dirty_player_fields and not self._pending_actions:
+            return
+        loaded_version = self._session_snapshot['version']
+        with transaction.atomic():
+            # Also claimed when only the log or the player changes, so a stale manager writes nothing
+            updated = GameSession.objects.filter(pk=self.session.pk, version=loaded_version).update(
+                version=loaded_version + 1, **{name: getattr(self.session, name) for name in changed})
+            if not updated:
+                raise StaleSessionError(f"Session {self.session.pk} changed since version {loaded_version} was loaded")
+            self.session.version = values['version'] = loaded_version + 1
+            if self._dirty_player_fields:
+                self.player.save(update_fields=sorted(self._dirty_player_fields))
+            if self._pending_actions:
+                HandAction.objects.bulk_create(self._pending_actions)
+            if self._pending_snapshot is not None:
+                self._pending_snapshot.save()
+        print(f"[DEBUG] Flushed session fields {changed}, player fields {sorted(self._dirty_player_fields)}, {len(self._pending_actions)} hand actions")
+        self._session_snapshot = values
+        self._dirty_player_fields = set()
+        self._pending_actions = []
+        self._pending_snapshot = None
 
     def _convert_action_to_string(self, action_type):
         """Convert action class to string representation"""
-        action_map = {
-            FoldAction: 'fold',
-            CallAction: 'call',
-            CheckAction: 'check',
-            RaiseAction: 'raise'
-        }
-        return action_map.get(action_type, 'unknown')
+        code = ACTION_CODES.get(action_type)
+        return ACTION_NAMES[code] if code is not None else 'unknown'
 
     def _get_legal_actions(self, round_state):
         """Convert legal actions to string list"""
-        legal_actions = round_state.legal_actions()
-        return [self._convert_action_to_string(action) for action in legal_actions]
+        return list(LEGAL_ACTION_NAMES[round_state.legal_mask()])
     
     def validate_buy_in(self):
         """Validate if player has enough coins for buy-in"""
@@ -37,14 +127,16 @@ class PokerGameManager:
 
     def process_buy_in(self):
         """Process the buy-in transaction"""
+        # The player row may have changed since this manager was cached
+        self.player.refresh_from_db(fields=['coins'])
         if not self.validate_buy_in():
             return False, "Insufficient coins for buy-in"
         
         try:
-            self.player.remove_coins(self.buy_in_amount)
-            self.player.save()
+            self.player.remove_coins(self.buy_in_amount, save=False)
+            self._dirty_player_fields.add('coins')
             self.session.current_coins = self.buy_in_amount
-            self.session.save()
+            self.flush()
             return True, "Buy-in successful"
         except ValueError as e:
             return False, str(e)
@@ -52,16 +144,18 @@ class PokerGameManager:
     def process_exit_game(self):
         """Process player exit and return remaining coins"""
         try:
+            self.player.refresh_from_db(fields=['coins'])
             # Get remaining stack
             remaining_stack = self.session.player_stack
             if remaining_stack > 0:
                 # Add coins back to player's account
-                self.player.add_coins(remaining_stack)
+                self.player.add_coins(remaining_stack, save=False)
+                self._dirty_player_fields.add('coins')
                 
                 # Update session
                 self.session.current_coins = 0
                 self.session.player_stack = 0
-                self.session.save()
+                self.flush()
                 
                 print(f"Successfully returned {remaining_stack} coins to {self.player.username}")
                 return remaining_stack
@@ -72,6 +166,8 @@ class PokerGameManager:
 
     def start_new_hand(self, continue_session=False):
         """Initialize a new hand of poker"""
+        # Read before dealing: rebuilding the previous hand's state resets the deck, seed and pot
+        previous_button = self._load_game_state().get('button', 0) if continue_session else 0
         self.total_pot = 0
         self.player_total_bet = 0
         self.bot_total_bet = 0
@@ -80,21 +176,27 @@ class PokerGameManager:
                 'requires_buy_in': True,
                 'buy_in_amount': self.buy_in_amount
             }
-        self.deck.shuffle()
-        player_cards = self.deck.deal(2)
-        bot_cards = self.deck.deal(2)
+        if self.settings.SEEDED_DECK:
+            self.deck_seed = secrets.randbits(63)
+            self.deck = seeded_deck(self.deck_seed)
+        else:
+            # A cached manager may still hold the seed of an earlier seeded hand
+            self.deck_seed = None
+            random.shuffle(self.deck)
+        player_cards = self.deck[0:2]
+        bot_cards = self.deck[2:4]
         
-        print(f"[DEBUG] Bot was dealt these cards: {bot_cards}")
+        print(f"[DEBUG] Bot was dealt these cards: {to_strs(bot_cards)}")
         
-        player_cards = [str(c) for c in player_cards]
-        bot_cards = [str(c) for c in bot_cards]
+        # The whole board is already fixed, so settle the showdown once here
+        outcome, self.hand_types = self._evaluate_showdown([player_cards, bot_cards], self.deck[4:9])
         
         # If continuing session, use existing stacks
         if continue_session:
             starting_player_stack = self.session.player_stack
             starting_bot_stack = self.session.bot_stack
             # Alternate button position each hand
-            button = 1 if self.session.game_state.get('button', 0) == 0 else 0
+            button = 1 if previous_button == 0 else 0
         else:
             starting_player_stack = self.settings.STARTING_STACK
             starting_bot_stack = self.settings.STARTING_STACK
@@ -115,44 +217,54 @@ class PokerGameManager:
             ]
         
         # Initialize round state
-        round_state = RoundState(
+        round_state = self._new_round_state(
             button=button,
             street=0,
             final_street=5,
             pips=pips,
             stacks=stacks,
             hands=[player_cards, bot_cards],
-            deck=[str(c) for c in self.deck.cards],
-            previous_state=None
+            deck=self.deck[4:],
+            outcome=outcome
         )
 
         # Update session
-        self.session.player_cards = player_cards
+        self.session.player_cards = to_strs(player_cards)
         self.session.board_cards = []
         self.session.pot = sum(pips)  # Track pot correctly
         self.session.player_stack = stacks[0]
         self.session.bot_stack = stacks[1]
         self.session.current_street = 'preflop'
-        self.session.game_state = self._serialize_game_state(round_state)
-        self.session.save()
+        self.session.bot_move_started = None
+        self.session.bot_move_result = None
+        self.session.hands_logged += 1
+        self.hand_actions = []
+        self.hand_start_stacks = [starting_player_stack, starting_bot_stack]
+        self._hand_has_snapshot = False
+        self._store_game_state(round_state)
+        self.flush()
         
         # Determine first to act based on street and button position
         is_player_turn = button == 0 and round_state.street > 0 or button == 1 and round_state.street == 0
+        if is_player_turn:
+            self._speculate(round_state)
 
         return {
             'requires_buy_in': False,
             'pot': self.session.pot,
             'player_stack': self.session.player_stack,
             'bot_stack': self.session.bot_stack,
-            'player_cards': self.convert_cards_to_display(player_cards),
+            'player_cards': self.convert_cards_to_display(self.session.player_cards),
             'board_cards': [],
             'legal_actions': self._get_legal_actions(round_state) if is_player_turn else [],
             'game_message': 'Your turn!' if is_player_turn else 'Waiting for bot...'
         }
         
-    def process_player_action(self, action_type, amount=0):
-        """Process a player's action and get the bot's response"""
-        round_state = self._deserialize_game_state(self.session.game_state)
+    def process_player_action(self, action_type, amount=0, defer_bot=False):
+        """Process a player's action and get the bot's response, or with defer_bot leave it to process_bot_action"""
+        if self.session.bot_move_started is not None:
+            return {'bot_pending': True, 'game_message': 'Waiting for bot...'}
+        round_state = self._deserialize_game_state(self._load_game_state())
         print(f"[DEBUG] Initial state - Pot: {self.session.pot}, Player Stack: {self.session.player_stack}, Bot Stack: {self.session.bot_stack}")
         
         if round_state is None:  # Terminal state
@@ -172,6 +284,8 @@ class PokerGameManager:
         # Create and apply player's action
         action = self._create_action(action_type, amount, round_state)
         next_state = round_state.proceed(action)
+        self._log_action(0, action, round_state.street)
+        current_pot = None
         print(f"[DEBUG] After player action - Pips: {next_state.pips if hasattr(next_state, 'pips') else 'Terminal'}")
         
         # Handle player fold
@@ -213,16 +327,57 @@ class PokerGameManager:
             
             bot_return = 0
             player_return = 0
-                
+
+        if defer_bot and not isinstance(next_state, TerminalState):
+            return self._defer_bot_move(next_state)
+        return self._bot_response(next_state, initial_state, action, current_pot)
+
+    def process_bot_action(self):
+        """Play the bot's deferred move on the stored state; the response is also kept on the session for polling"""
+        round_state = self._deserialize_game_state(self._load_game_state())
+        if round_state is None or self.session.bot_move_started is None:
+            return self.session.bot_move_result
+        initial_state = {
+            'player_stack': self.session.player_stack,
+            'bot_stack': self.session.bot_stack,
+            'pot': self.session.pot
+        }
+        return self._bot_response(round_state, initial_state, None, self.total_pot + sum(round_state.pips))
+
+    def _defer_bot_move(self, round_state):
+        """Store the state the bot has to answer and mark its move as pending"""
+        self.session.bot_move_started = timezone.now()
+        self.session.bot_move_result = None
+        self._store_game_state(round_state)
+        self.flush()
+        return {
+            'pot': self.total_pot + sum(round_state.pips),
+            'player_stack': round_state.stacks[0],
+            'bot_stack': round_state.stacks[1],
+            'player_cards': self.convert_cards_to_display(self.session.player_cards),
+            'board_cards': self.convert_cards_to_display(to_strs(round_state.deck[:round_state.street])),
+            'legal_actions': [],
+            'hand_complete': False,
+            'hand_types': [],
+            'bot_pending': True,
+            'game_message': 'Waiting for bot...'
+        }
+
+    def _bot_response(self, next_state, initial_state, action, current_pot):
+        """Let the bot answer next_state, settle the hand if it ended and build the response"""
+        hand_record = None
         # Handle bot response
         try:
             if not isinstance(next_state, TerminalState):
                 dummy_game_state = None
-                bot_action = self.rebel_bot.get_action(dummy_game_state, next_state, 1)
+                bot_action = self._speculated_action(next_state)
+                if bot_action is None:
+                    bot_action = self._timed_bot_action(dummy_game_state, next_state)
                 print(f"[DEBUG] Bot action: {self._action_to_string(bot_action)}")
                 
                 previous_state = next_state
                 next_state = next_state.proceed(bot_action)
+                self._log_action(1, bot_action, previous_state.street)
                 bot_action_msg = f"Bot {self._action_to_string(bot_action)}"
                 
                 # Handle bot fold
@@ -256,9 +411,14 @@ class PokerGameManager:
             print(f"[DEBUG] Bot action error: {str(e)}")
             bot_action_msg = "Bot checks"
             if not isinstance(next_state, TerminalState):
+                street = next_state.street
                 next_state = next_state.proceed(CheckAction())
+                self._log_action(1, CheckAction(), street)
+                if current_pot is None and not isinstance(next_state, TerminalState):
+                    current_pot = self.total_pot + sum(next_state.pips)
         
         # Update stacks and pot based on final state
+        showdown = False
         if isinstance(next_state, TerminalState):
             if hasattr(next_state, 'deltas'):
                 print(f"[DEBUG] Terminal state - Final pot: {self.total_pot}, Deltas: {next_state.deltas}")
@@ -279,6 +439,7 @@ class PokerGameManager:
                     winner = "Player"
                 # Handle normal win/loss (no fold)
                 else:
+                    showdown = True
                     if next_state.deltas[0] > 0:  # Player wins
                         win_amount = self.total_pot
                         final_player_stack = initial_state['player_stack'] + win_amount
@@ -296,6 +457,7 @@ class PokerGameManager:
                         winner = "Split"
                 
                 print(f"[DEBUG] {winner} wins {win_amount} - Final stacks - Player: {final_player_stack}, Bot: {final_bot_stack}")
+                hand_record = self._build_hand_record(next_state, win_amount, winner, showdown, final_player_stack)
                 self.session.player_stack = final_player_stack
                 self.session.bot_stack = final_bot_stack
                 self.session.pot = self.total_pot  # Keep final pot for display
@@ -316,6 +478,7 @@ class PokerGameManager:
             'board_cards': self.convert_cards_to_display(self.session.board_cards),
             'legal_actions': self._get_legal_actions(next_state) if not isinstance(next_state, TerminalState) else [],
             'hand_complete': isinstance(next_state, TerminalState),
+            'hand_types': self.hand_types if showdown else [],
             'game_message': self._get_game_message(next_state, bot_action_msg)
         }
         
@@ -323,9 +486,20 @@ class PokerGameManager:
         if isinstance(next_state, TerminalState):
             self.session.pot = 0
             self.total_pot = 0
-            self.session.save()
             print("[DEBUG] Pot reset for next hand")
+
+        if self.session.bot_move_started is not None:
+            # A deferred move: any worker can now answer the poll from the session
+            response_data['bot_pending'] = False
+            self.session.bot_move_started = None
+            self.session.bot_move_result = response_data
         
+        self.flush()
+        # Queued only once the hand's final state is committed
+        if hand_record is not None and self.settings.HAND_RECORDS:
+            hand_record_writer.add(hand_record)
+        if not isinstance(next_state, TerminalState):
+            self._speculate(next_state)
         return response_data
 
     def _create_action(self, action_type, amount, round_state):
@@ -344,15 +518,9 @@ class PokerGameManager:
 
     def _action_to_string(self, action):
         """Convert action object to readable string"""
-        if isinstance(action, FoldAction):
-            return "folds"
-        elif isinstance(action, CallAction):
-            return "calls"
-        elif isinstance(action, CheckAction):
-            return "checks"
-        elif isinstance(action, RaiseAction):
-            return f"raises to {action.amount}"
-        return "unknown action"
+        if type(action) not in ACTION_CODES:
+            return "unknown action"
+        return action_message(action)
 
     def _get_game_message(self, round_state, bot_action_msg=""):
         """Generate appropriate game message based on state"""
@@ -378,12 +546,12 @@ class PokerGameManager:
             if round_state.previous_state and round_state.previous_state.street > 0:
                 street = round_state.previous_state.street
                 visible_cards = round_state.previous_state.deck[:street]
-                self.session.board_cards = [str(card) for card in visible_cards]
+                self.session.board_cards = to_strs(visible_cards)
                 # Don't modify pot in terminal state
         else:
             if round_state.street > 0:
                 visible_cards = round_state.deck[:round_state.street]
-                self.session.board_cards = [str(card) for card in visible_cards]
+                self.session.board_cards = to_strs(visible_cards)
             
             # Update street name
             street_names = {0: 'preflop', 3: 'flop', 4: 'turn', 5: 'river'}
@@ -396,10 +564,159 @@ class PokerGameManager:
                 if self.session.pot != current_pot:
                     self.session.pot = current_pot
         
-        self.session.game_state = self._serialize_game_state(round_state)
-        self.session.save()
+        self._store_game_state(round_state)
         print(f"[DEBUG] Final session state - Pot: {self.session.pot}")
             
+    def _timed_bot_action(self, game_state, round_state):
+        """
+        Ask the bot for its action under the BOT_ACTION_BUDGET latency budget. The decision runs on a
+        copy of the bot; a copy that answers within BOT_ACTION_GRACE of the deadline becomes the live bot,
+        otherwise it is cancelled and the bot checks, or folds when it cannot check.
+        The budget counts from when the decision starts running, but never past the point the request gives up
+        """
+        budget = self.settings.BOT_ACTION_BUDGET
+        bot = copy.copy(self.rebel_bot)
+        # An abandoned decision may still be running, so the copy never shares a generator with the live bot
+        bot.rng = np.random.default_rng()
+        cancelled = threading.Event()
+        started = time.monotonic()
+        wait = budget + self.settings.BOT_ACTION_GRACE
+        future = decision_executor.submit(_decide, bot, game_state, round_state, budget, started + wait, cancelled)
+        pending_decisions.add(future)
+        future.add_done_callback(pending_decisions.discard)
+        try:
+            action = future.result(timeout=wait)
+        except TimeoutError:
+            # Frees the decision thread: a queued decision never starts, a running one stops at its next refine step
+            cancelled.set()
+            future.cancel()
+            action = CheckAction() if CheckAction in round_state.legal_actions() else FoldAction()
+            logger.warning("Session %s: bot missed its %ss deadline with %s decisions pending, playing %s",
+                           self.session.pk, budget, len(pending_decisions), self._action_to_string(action))
+            return action
+        elapsed = time.monotonic() - started
+        if elapsed > budget:
+            logger.info("Session %s: bot overran its %ss budget: %.3fs", self.session.pk, budget, elapsed)
+        self.rebel_bot = bot
+        return action
+
+    def _speculate(self, round_state):
+        """Start precomputing the bot's replies to the human's likely actions at round_state"""
+        if self.settings.SPECULATIVE_BOT:
+            bot_speculator.speculate(self.session.session_id, round_state, self.rebel_bot)
+
+    def _speculated_action(self, round_state):
+        """
+        The bot's precomputed reply at round_state, if the human's action was predicted.
+        The copy of the bot that chose it becomes the live bot, keeping the state the decision left on it
+        """
+        if not self.settings.SPECULATIVE_BOT:
+            return None
+        branch = bot_speculator.take(self.session.session_id, round_state)
+        if branch is None:
+            return None
+        action, self.rebel_bot = branch
+        print(f"[DEBUG] Using speculated bot action: {self._action_to_string(action)}")
+        return action
+
+    def _log_action(self, actor, action, street):
+        """Queue one applied action for the hand log; written by the next flush"""
+        code = encode_action(action)
+        if self.hand_actions is not None:
+            self.hand_actions.append((actor, code))
+        if not self.settings.EVENT_LOG:
+            return
+        self.session.log_sequence += 1
+        self._pending_actions.append(HandAction(
+            session=self.session,
+            sequence=self.session.log_sequence,
+            hand=self.session.hands_logged,
+            actor=actor,
+            street=street,
+            code=code,
+            total_pot=self.total_pot
+        ))
+
+    def _store_game_state(self, round_state):
+        """Record the state after this request: the full blob without the hand log, else a snapshot when one is due"""
+        state = self._serialize_game_state(round_state)
+        if not self.settings.EVENT_LOG:
+            self.session.store_game_state(state)
+            return
+        if self._pending_actions:
+            # Replay restores total_pot from the last row, so it carries the pot after this request
+            self._pending_actions[-1].total_pot = self.total_pot
+        sequence = self.session.log_sequence
+        previous = self._session_snapshot['log_sequence']
+        interval = self.settings.SNAPSHOT_INTERVAL
+        # Every hand starts with a snapshot; a terminal state needs none since the next hand writes its own
+        if not self._hand_has_snapshot or (not state['terminal'] and sequence // interval > previous // interval):
+            self._pending_snapshot = HandSnapshot(
+                session=self.session,
+                hand=self.session.hands_logged,
+                sequence=sequence,
+                data=encode_game_state(state)
+            )
+            self._hand_has_snapshot = True
+
+    def _load_game_state(self):
+        """Rebuild the stored state from the hand's latest snapshot plus the actions logged after it"""
+        snapshot = None
+        if self.settings.EVENT_LOG:
+            snapshot = self.session.hand_snapshots.filter(hand=self.session.hands_logged).order_by('-sequence').first()
+        self._hand_has_snapshot = snapshot is not None
+        if snapshot is None:
+            return self.session.load_game_state()
+        state = snapshot.load_game_state()
+        logged = list(self.session.hand_actions.filter(hand=snapshot.hand).order_by('sequence'))
+        tail = [row for row in logged if row.sequence > snapshot.sequence]
+        if tail and not state['terminal']:
+            round_state = self._deserialize_game_state(state)
+            for row in tail:
+                round_state = round_state.proceed(decode_action(row.code))
+            self.total_pot = tail[-1].total_pot
+            state = self._serialize_game_state(round_state)
+        # The log holds the whole hand, whatever the snapshot carried
+        self.hand_actions = [(row.actor, row.code) for row in logged]
+        if not state['terminal']:
+            state['actions'] = list(self.hand_actions)
+        return state
+
+    def _build_hand_record(self, terminal_state, win_amount, winner, showdown, final_player_stack):
+        """
+        Describe a finished hand as an unsaved HandRecord, or None when the hand is not fully known:
+        a state stored before actions and start stacks were kept, or a delta contradicting the winner
+        """
+        if self.hand_actions is None or self.hand_start_stacks is None:
+            logger.warning("Session %s hand %s has no complete action list, not recorded", self.session.pk, self.session.hands_logged)
+            return None
+        player_delta = final_player_stack - self.hand_start_stacks[0]
+        winner = {'Player': 0, 'Bot': 1, 'Split': 2}[winner]
+        if (winner == 0 and player_delta <= 0) or (winner == 1 and player_delta >= 0):
+            logger.warning("Session %s hand %s: player delta %s contradicts winner %s, not recorded",
+                           self.session.pk, self.session.hands_logged, player_delta, winner)
+            return None
+        last_state = terminal_state.previous_state
+        return HandRecord(
+            session=self.session,
+            hand=self.session.hands_logged,
+            # RoundState.button counts actions; the seat that acted first preflop holds the button
+            button=self.hand_actions[0][0] if self.hand_actions else 0,
+            cards=bytes(list(last_state.hands[0]) + list(last_state.hands[1]) + list(last_state.deck[:5])),
+            street=last_state.street,
+            actions=encode_hand_actions(self.hand_actions),
+            pot=win_amount,
+            player_delta=player_delta,
+            winner=winner,
+            showdown=showdown
+        )
+
+    def _evaluate_showdown(self, hands, board):
+        """Evaluate both 7-card hands, returning the outcome for hands[0] and the hand categories"""
+        scores = [evaluate(board + hand) for hand in hands]
+        outcome = (scores[0] > scores[1]) - (scores[0] < scores[1])
+        return outcome, [hand_type(score) for score in scores]
+
     def _is_hand_complete(self, round_state):
         return hasattr(round_state, 'deltas')
 
@@ -413,6 +730,8 @@ class PokerGameManager:
         
         display_cards = []
         for card in cards:
+            if isinstance(card, int):
+                card = CARD_STRINGS[card]
             if isinstance(card, str):
                 value = card[0].upper()
                 suit = card[1].lower()
@@ -427,6 +746,12 @@ class PokerGameManager:
             })
         return display_cards
 
+    def _new_round_state(self, **fields):
+        """Build the first state of a hand with the configured RoundState implementation"""
+        if self.round_state_class is RoundState:
+            fields['previous_state'] = None
+        return self.round_state_class(**fields)
+
     def _serialize_game_state(self, round_state):
         """Serialize the game state for storage"""
         if isinstance(round_state, TerminalState):
@@ -434,35 +759,62 @@ class PokerGameManager:
                 'terminal': True,
                 'deltas': round_state.deltas if hasattr(round_state, 'deltas') else None,
                 'button': round_state.previous_state.button if round_state.previous_state else 0,
+                'hand_types': self.hand_types,
+                'deck_seed': self.deck_seed,
                 'total_pot': self.total_pot  # Save total_pot in the game state
             }
-        return {
+        state = {
             'terminal': False,
             'button': round_state.button,
             'street': round_state.street,
             'final_street': round_state.final_street,
             'pips': round_state.pips,
             'stacks': round_state.stacks,
-            'hands': [[str(c) for c in h] for h in round_state.hands],
-            'deck': [str(c) for c in round_state.deck],
-            'total_pot': self.total_pot  # Save total_pot in the game state
+            'outcome': round_state.outcome,
+            'zobrist': round_state.zobrist,
+            'hand_types': self.hand_types,
+            'total_pot': self.total_pot,  # Save total_pot in the game state
+            'start_stacks': self.hand_start_stacks
         }
+        if self.hand_actions is not None:
+            state['actions'] = list(self.hand_actions)
+        # A seeded hand is stored as its seed; the cards are dealt again on load
+        if self.deck_seed is not None:
+            state['deck_seed'] = self.deck_seed
+        else:
+            state['hands'] = [to_strs(h) for h in round_state.hands]
+            state['deck'] = to_strs(round_state.deck)
+        return state
 
     def _deserialize_game_state(self, state_dict):
         """Deserialize the stored game state"""
         if state_dict.get('terminal', False):
             return None
 
-        # Restore total_pot from game state
+        # Restore total_pot and the precomputed showdown from game state
         self.total_pot = state_dict.get('total_pot', 0)
+        self.hand_types = state_dict.get('hand_types', [])
+        # States stored before these were kept leave the rest of the hand unrecorded
+        self.hand_start_stacks = state_dict.get('start_stacks')
+        self.hand_actions = [tuple(action) for action in state_dict['actions']] if 'actions' in state_dict else None
+
+        self.deck_seed = state_dict.get('deck_seed')
+        if self.deck_seed is not None:
+            self.deck = seeded_deck(self.deck_seed)
+            hands = [self.deck[0:2], self.deck[2:4]]
+            deck = self.deck[4:]
+        else:
+            hands = [to_ints(h) for h in state_dict['hands']]
+            deck = to_ints(state_dict['deck'])
 
-        return RoundState(
+        return self._new_round_state(
             button=state_dict['button'],
             street=state_dict['street'],
             final_street=state_dict['final_street'],
             pips=state_dict['pips'],
             stacks=state_dict['stacks'],
-            hands=state_dict['hands'],
-            deck=state_dict['deck'],
-            previous_state=None
+            hands=hands,
+            deck=deck,
+            outcome=state_dict.get('outcome'),
+            zobrist=state_dict.get('zobrist')
         )
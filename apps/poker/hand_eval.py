@@ -0,0 +1,244 @@
+# poker/hand_eval.py
+'''
+Vectorized hand evaluator for NumPy arrays of integer cards.
+
+Hands are given as an (N, k) array of distinct card ints (see cards.py),
+with 5 <= k <= 7. The returned values are bit-for-bit identical to
+eval7.evaluate: the hand category in bits 24-27 followed by up to five
+4-bit ranks, so they can be compared with each other and with eval7 scores.
+'''
+import os
+from math import comb
+from itertools import combinations_with_replacement
+import numpy as np
+
+HIGH_CARD, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, STRAIGHT_FLUSH = range(9)
+
+NUM_RANKS = 13
+NUM_MASKS = 1 << NUM_RANKS
+
+# Generated by `manage.py build_rank_table`; loaded read-only with mmap so workers share one copy
+RANK_TABLE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'rank7.npy')
+
+def _build_rank_tables():
+    '''
+    Precomputes per 13-bit rank mask: bit count, highest rank, the top five
+    ranks packed as nibbles (r1 << 16 | ... | r5) and the high card of the
+    best straight (-1 if none, 3 for the wheel).
+    '''
+    masks = np.arange(NUM_MASKS)
+    bits = (masks[:, None] >> np.arange(NUM_RANKS)) & 1
+
+    popcount = bits.sum(axis=1).astype(np.int8)
+
+    top = np.full(NUM_MASKS, -1, dtype=np.int32)
+    top5 = np.zeros(NUM_MASKS, dtype=np.int32)
+    found = np.zeros(NUM_MASKS, dtype=np.int32)
+    for rank in range(NUM_RANKS - 1, -1, -1):
+        has = bits[:, rank].astype(bool)
+        top[(top < 0) & has] = rank
+        take = has & (found < 5)
+        top5[take] |= rank << (4 * (4 - found[take]))
+        found[take] += 1
+
+    straight = np.full(NUM_MASKS, -1, dtype=np.int32)
+    for high in range(NUM_RANKS - 1, 3, -1):
+        run = 0x1F << (high - 4)
+        straight[(straight < 0) & ((masks & run) == run)] = high
+    wheel = 0x100F  # A2345
+    straight[(straight < 0) & ((masks & wheel) == wheel)] = 3
+
+    return popcount, top, top5, straight
+
+POPCOUNT, TOP, TOP5, STRAIGHT_HIGH = _build_rank_tables()
+RANK_BITS = (1 << np.arange(NUM_RANKS)).astype(np.int32)
+# Per card: its rank bit, and its rank bit shifted into the 16-bit lane of its suit
+CARD_RANK_BITS = np.repeat(RANK_BITS, 4)
+CARD_SUIT_BITS = CARD_RANK_BITS.astype(np.int64) << (16 * np.tile(np.arange(4, dtype=np.int64), NUM_RANKS))
+# Per card: a 1 in the 4-bit counter of its suit
+CARD_SUIT_COUNTS = (1 << (4 * np.tile(np.arange(4), NUM_RANKS))).astype(np.int32)
+
+def _build_flush_suits():
+    '''
+    Maps four packed 4-bit suit counters to the suit holding five or more cards, or -1.
+    '''
+    counters = (np.arange(1 << 16)[:, None] >> (4 * np.arange(4))) & 0xF
+    return np.where(counters.max(axis=1) >= 5, counters.argmax(axis=1), -1).astype(np.int8)
+
+FLUSH_SUIT = _build_flush_suits()
+
+# Perfect hash of a 7-card rank multiset: with sorted ranks r_0 <= .. <= r_6,
+# s_i = r_i + i is strictly increasing in 0..18 and sum(C(s_i, i + 1)) is its
+# colex index, so every multiset maps to a distinct slot below C(19, 7).
+MULTISET_SLOTS = 50388
+_SLOT_OFFSETS = np.arange(7)
+# Per sorted column i: C(s, i + 1) indexed by the column's rank (s = rank + i)
+_SLOT_KEYS = [np.array([comb(rank + i, i + 1) for rank in range(NUM_RANKS)], dtype=np.int32) for i in range(7)]
+# Optimal 16-comparator sorting network for 7 elements
+_SORT7 = [(0, 6), (2, 3), (4, 5), (0, 2), (1, 4), (3, 6), (0, 1), (2, 5),
+          (3, 4), (1, 2), (4, 6), (2, 3), (4, 5), (1, 2), (3, 4), (5, 6)]
+
+def _flush_masks(columns):
+    '''
+    Returns the rank mask of the flush suit per hand, or 0 without a flush.
+    '''
+    # Count cards per suit in 4-bit nibbles first; flushes are rare, so only
+    # build the per-suit rank masks for the hands that have one
+    suit_counts = CARD_SUIT_COUNTS[columns[0]]
+    for column in columns[1:]:
+        suit_counts = suit_counts + CARD_SUIT_COUNTS[column]
+    flush_suit = FLUSH_SUIT[suit_counts]
+    flush_mask = np.zeros(columns.shape[1], dtype=np.int32)
+    rows = np.nonzero(flush_suit >= 0)[0]
+    if len(rows):
+        # Per-suit rank masks packed in 16-bit lanes
+        suit_lanes = CARD_SUIT_BITS[columns[:, rows]].sum(axis=0)
+        flush_mask[rows] = (suit_lanes >> (16 * flush_suit[rows])) & (NUM_MASKS - 1)
+    return flush_mask
+
+def build_rank_table():
+    '''
+    Generates the 7-card lookup table: NUM_MASKS flush entries indexed by the
+    flush suit's rank mask, followed by MULTISET_SLOTS entries indexed by the
+    perfect hash of the rank multiset. Values come from evaluate_batch.
+    '''
+    flush_table = np.zeros(NUM_MASKS, dtype=np.int32)
+    for size in (5, 6, 7):
+        masks = np.nonzero(POPCOUNT == size)[0]
+        ranks = (masks[:, None] >> np.arange(NUM_RANKS)) & 1
+        hands = np.nonzero(ranks)[1].reshape(len(masks), size) * 4  # all clubs
+        flush_table[masks] = _evaluate_masks(hands.T)
+
+    multisets = np.array([ranks for ranks in combinations_with_replacement(range(NUM_RANKS), 7)
+                          if max(ranks.count(r) for r in ranks) <= 4])
+    # Cycle suits across the sorted cards so no rank repeats a suit and no suit holds five
+    hands = multisets * 4 + _SLOT_OFFSETS % 4
+    multiset_table = np.zeros(MULTISET_SLOTS, dtype=np.int32)
+    multiset_table[_multiset_slots(multisets.T)] = _evaluate_masks(hands.T)
+    return np.concatenate([flush_table, multiset_table])
+
+def load_rank_table(path=RANK_TABLE_PATH):
+    '''
+    Memory-maps the generated 7-card table, or returns None if it has not been built.
+    '''
+    if not os.path.exists(path):
+        return None
+    table = np.load(path, mmap_mode='r')
+    if table.shape != (NUM_MASKS + MULTISET_SLOTS,):
+        return None
+    return table
+
+RANK_TABLE = load_rank_table()
+
+def _multiset_slots(columns):
+    '''
+    Maps seven sorted rank columns to their perfect-hash slots.
+    '''
+    slots = _SLOT_KEYS[0][columns[0]]
+    for i in range(1, 7):
+        slots = slots + _SLOT_KEYS[i][columns[i]]
+    return slots
+
+def _sorted_rank_columns(columns):
+    '''
+    Sorts the ranks of each 7-card hand, returned as a list of seven columns.
+    '''
+    ranks = [column >> 2 for column in columns]
+    for i, j in _SORT7:
+        low = np.minimum(ranks[i], ranks[j])
+        ranks[j] = np.maximum(ranks[i], ranks[j])
+        ranks[i] = low
+    return ranks
+
+def _evaluate_table(columns):
+    '''
+    Ranks 7-card hands with O(1) lookups into RANK_TABLE.
+    '''
+    flush_mask = _flush_masks(columns)
+    slots = _multiset_slots(_sorted_rank_columns(columns))
+    values = RANK_TABLE[NUM_MASKS + slots]
+    return np.where(flush_mask != 0, RANK_TABLE[flush_mask], values).astype(np.int32)
+
+def evaluate_batch(hands):
+    '''
+    Ranks N hands in one call.
+
+    Arguments:
+    hands: (N, k) array-like of distinct card ints, 5 <= k <= 7.
+
+    Returns:
+    (N,) int32 array of eval7-compatible hand values.
+    '''
+    hands = np.asarray(hands)
+    if hands.ndim == 1:
+        hands = hands[None, :]
+    # Work on one contiguous row per card position, as native ints for fast table lookups
+    columns = hands.T.astype(np.intp, order='C')
+    if RANK_TABLE is not None and len(columns) == 7:
+        return _evaluate_table(columns)
+    return _evaluate_masks(columns)
+
+def _evaluate_masks(columns):
+    '''
+    Ranks hands, given as (k, N) card columns, from their rank masks without the lookup table.
+    '''
+    n = columns.shape[1]
+
+    # Masks of ranks held at least 1..4 times
+    m1 = np.zeros(n, dtype=np.int32)
+    m2 = np.zeros(n, dtype=np.int32)
+    m3 = np.zeros(n, dtype=np.int32)
+    m4 = np.zeros(n, dtype=np.int32)
+    for column in columns:
+        bit = CARD_RANK_BITS[column]
+        m4 |= m3 & bit
+        m3 |= m2 & bit
+        m2 |= m1 & bit
+        m1 |= bit
+
+    flush_mask = _flush_masks(columns)
+    has_flush = flush_mask != 0
+
+    top_m4 = TOP[m4]
+    top_m3 = TOP[m3]
+    top_m2 = TOP[m2]
+    clear_m4 = m1 & ~(1 << np.maximum(top_m4, 0))
+    clear_m3 = m1 & ~(1 << np.maximum(top_m3, 0))
+    clear_m2 = m1 & ~(1 << np.maximum(top_m2, 0))
+    second_pair = TOP[m2 & ~(1 << np.maximum(top_m2, 0))]
+    fh_pair = TOP[m2 & ~(1 << np.maximum(top_m3, 0))]
+    two_pair_kicker = TOP[clear_m2 & ~(1 << np.maximum(second_pair, 0))]
+
+    flush_straight = STRAIGHT_HIGH[flush_mask]
+    straight = STRAIGHT_HIGH[m1]
+    pairs = POPCOUNT[m2]
+
+    conditions = [
+        has_flush & (flush_straight >= 0),
+        m4 != 0,
+        (m3 != 0) & (fh_pair >= 0),
+        has_flush,
+        straight >= 0,
+        m3 != 0,
+        pairs >= 2,
+        pairs == 1,
+    ]
+    choices = [
+        (STRAIGHT_FLUSH << 24) | (flush_straight << 16),
+        (QUADS << 24) | (top_m4 << 16) | (TOP[clear_m4] << 12),
+        (FULL_HOUSE << 24) | (top_m3 << 16) | (fh_pair << 12),
+        (FLUSH << 24) | TOP5[flush_mask],
+        (STRAIGHT << 24) | (straight << 16),
+        (TRIPS << 24) | (top_m3 << 16) | ((TOP5[clear_m3] >> 12) << 8),
+        (TWO_PAIR << 24) | (top_m2 << 16) | (second_pair << 12) | (two_pair_kicker << 8),
+        (PAIR << 24) | (top_m2 << 16) | ((TOP5[clear_m2] >> 8) << 4),
+    ]
+    return np.select(conditions, choices, default=TOP5[m1]).astype(np.int32)
+
+def compare_batch(hands0, hands1):
+    '''
+    Returns 1, -1 or 0 per row depending on which of two hand arrays wins.
+    '''
+    values0 = evaluate_batch(hands0)
+    values1 = evaluate_batch(hands1)
+    return np.sign(values0 - values1).astype(np.int8)
@@ -0,0 +1,113 @@
+# poker/hand_records.py
+'''
+Buffered background writer for HandRecord rows.
+
+Completed hands are queued in memory and inserted with bulk_create by a
+daemon thread, either as soon as HAND_RECORD_BATCH_SIZE records are waiting
+or every HAND_RECORD_FLUSH_SECONDS, so finishing a hand adds no insert to the
+request. Records still queued at interpreter exit are written by an atexit
+hook; a crashed worker loses at most its current buffer.
+
+When a batch insert fails, its records are inserted one by one so a single
+bad row cannot hold back the rest. A record that fails HAND_RECORD_ATTEMPTS
+times is logged and dropped, and the buffer never holds more than
+HAND_RECORD_BUFFER_SIZE records, so a database outage cannot grow it
+without bound.
+'''
+import atexit
+import logging
+import threading
+
+from django.db import close_old_connections, transaction
+
+from .config import PokerSettings
+from .models import HandRecord
+
+logger = logging.getLogger(__name__)
+
+class HandRecordWriter:
+    def __init__(self, batch_size=PokerSettings.HAND_RECORD_BATCH_SIZE, flush_seconds=PokerSettings.HAND_RECORD_FLUSH_SECONDS,
+                 max_buffer=PokerSettings.HAND_RECORD_BUFFER_SIZE, max_attempts=PokerSettings.HAND_RECORD_ATTEMPTS):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_buffer = max_buffer
+        self.max_attempts = max_attempts
+        self._buffer = []  # (record, failed inserts so far)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def add(self, record):
+        '''
+        Queues an unsaved HandRecord; starts the writer thread on first use.
+        '''
+        with self._lock:
+            self._buffer.append((record, 0))
+            self._trim()
+            full = len(self._buffer) >= self.batch_size
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='hand-record-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[DEBUG] Hand record flush failed: {str(e)}")
+
+    def _trim(self):
+        # Called with the lock held
+        overflow = len(self._buffer) - self.max_buffer
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped += overflow
+            logger.error("Hand record buffer full, dropped the %s oldest records", overflow)
+
+    def flush(self):
+        '''
+        Inserts every queued record now and returns how many were written.
+        If the batch insert fails the records are inserted one at a time; each one
+        that still fails goes back to the front of the queue, or is dropped once it
+        has failed max_attempts times.
+        '''
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        close_old_connections()
+        try:
+            with transaction.atomic():
+                HandRecord.objects.bulk_create([record for record, _ in batch], batch_size=self.batch_size)
+            return len(batch)
+        except Exception as e:
+            logger.warning("Hand record batch insert failed, inserting one by one: %s", e)
+        written, retry = 0, []
+        for record, attempts in batch:
+            try:
+                with transaction.atomic():
+                    record.save(force_insert=True)
+                written += 1
+            except Exception as e:
+                attempts += 1
+                if attempts < self.max_attempts:
+                    retry.append((record, attempts))
+                else:
+                    self.dropped += 1
+                    logger.error("Dropped hand record for session %s hand %s after %s failed inserts: %s",
+                                 record.session_id, record.hand, attempts, e)
+        with self._lock:
+            self._buffer[:0] = retry
+            self._trim()
+        return written
+
+    def __len__(self):
+        return len(self._buffer)
+
+hand_record_writer = HandRecordWriter()
@@ -0,0 +1,100 @@
+# poker/isomorphism.py
+'''
+Suit-isomorphism canonicalization of hole cards and boards.
+
+Permuting the four suits never changes a hand's strategic value, so every
+(hole, board) situation is mapped to one canonical representative: suits are
+relabeled in descending order of their per-group rank masks and each group
+of cards (hole, flop, turn, river) is sorted. Up to 24 raw states share one
+canonical form.
+
+Canonical forms are numbered with a stable integer index: each group is
+ranked colexicographically among the cards left unused by the earlier groups
+and the ranks are combined in mixed radix. Indexes never change between runs
+or processes, so they can key persistent tables; they are unique but not
+dense (see index_size for the range).
+'''
+from math import comb
+
+from .cards import NUM_CARDS, to_ints
+
+# Board cards dealt on each street, keyed by street (number of visible board cards)
+STREET_GROUPS = {0: (), 3: (3,), 4: (3, 1), 5: (3, 1, 1)}
+
+def split_board(board):
+    '''
+    Splits a board in deal order into its flop, turn and river groups.
+    '''
+    groups = []
+    start = 0
+    for size in STREET_GROUPS[len(board)]:
+        groups.append(board[start:start + size])
+        start += size
+    return groups
+
+def canonicalize(groups):
+    '''
+    Returns the canonical form of a sequence of card groups as a tuple of sorted tuples.
+
+    Suits are ordered by their tuple of per-group rank masks; suits with equal
+    masks are interchangeable, so ties do not affect the result.
+    '''
+    groups = [to_ints(group) for group in groups]
+    signatures = [tuple(sum(1 << (c >> 2) for c in group if c & 3 == suit) for group in groups)
+                  for suit in range(4)]
+    order = sorted(range(4), key=lambda suit: signatures[suit], reverse=True)
+    relabel = [0] * 4
+    for new_suit, suit in enumerate(order):
+        relabel[suit] = new_suit
+    return tuple(tuple(sorted((c & ~3) | relabel[c & 3] for c in group)) for group in groups)
+
+def group_index(groups):
+    '''
+    Returns the mixed-radix colex index of a sequence of disjoint card groups.
+    '''
+    used = 0
+    index = 0
+    remaining = NUM_CARDS
+    for group in groups:
+        rank = 0
+        for i, card in enumerate(sorted(group)):
+            # Position of the card among the cards not used by earlier groups
+            position = card - bin(used & ((1 << card) - 1)).count('1')
+            rank += comb(position, i + 1)
+        index = index * comb(remaining, len(group)) + rank
+        for card in group:
+            used |= 1 << card
+        remaining -= len(group)
+    return index
+
+def canonical_hand(hole, board=()):
+    '''
+    Returns the canonical (hole, flop, turn, river) groups present on this street.
+    '''
+    board = to_ints(board)
+    return canonicalize([hole] + split_board(board))
+
+def hand_index(hole, board=()):
+    '''
+    Returns the stable index of a (hole, board) situation on the board's street.
+    '''
+    return group_index(canonical_hand(hole, board))
+
+def board_index(board):
+    '''
+    Returns the stable index of a public board, ignoring private cards.
+    '''
+    board = to_ints(board)
+    return group_index(canonicalize(split_board(board)))
+
+def index_size(street, hole=True):
+    '''
+    Returns the exclusive upper bound of hand_index (or board_index with hole=False) on a street.
+    '''
+    sizes = ((2,) if hole else ()) + STREET_GROUPS[street]
+    size = 1
+    remaining = NUM_CARDS
+    for group_size in sizes:
+        size *= comb(remaining, group_size)
+        remaining -= group_size
+    return size
@@ -0,0 +1,49 @@
+# poker/management/commands/build_preflop_table.py
+import os
+from multiprocessing import Pool
+import numpy as np
+from django.core.management.base import BaseCommand
+from apps.poker import preflop
+
+def _vs_random_task(args):
+    index, iters, seed = args
+    return preflop.simulate_vs_random(index, iters, seed)
+
+def _matchup_task(args):
+    index, iters, seed = args
+    return preflop.simulate_matchups(index, iters, seed)
+
+class Command(BaseCommand):
+    help = 'Regenerates the 169-hand preflop equity table with parallel Monte Carlo simulation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--random-iters', type=int, default=2000000,
+                            help='Samples per hand against a random hand')
+        parser.add_argument('--matchup-iters', type=int, default=20000,
+                            help='Samples per hand-vs-hand matchup')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Worker processes')
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--output', default=preflop.PREFLOP_TABLE_PATH)
+
+    def handle(self, *args, **options):
+        seeds = np.random.SeedSequence(options['seed']).spawn(2 * preflop.NUM_CLASSES)
+        classes = range(preflop.NUM_CLASSES)
+
+        with Pool(options['workers']) as pool:
+            vs_random = pool.map(_vs_random_task, [
+                (i, options['random_iters'], seeds[i]) for i in classes
+            ])
+            self.stdout.write('Finished equities against a random hand')
+            matchups = np.array(pool.map(_matchup_task, [
+                (i, options['matchup_iters'], seeds[preflop.NUM_CLASSES + i]) for i in classes
+            ]))
+
+        # Each matchup was sampled from both sides; average them so the matrix is consistent
+        matchups = (matchups + 1 - matchups.T) / 2
+
+        os.makedirs(os.path.dirname(options['output']), exist_ok=True)
+        preflop.save_table(vs_random, matchups, options['output'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote preflop table ({os.path.getsize(options['output'])} bytes) to {options['output']}"
+        ))
@@ -0,0 +1,27 @@
+# poker/management/commands/build_rank_table.py
+import os
+import numpy as np
+from django.core.management.base import BaseCommand
+from apps.poker import hand_eval
+
+class Command(BaseCommand):
+    help = 'Generates the memory-mapped 7-card rank lookup table used by the hand evaluator'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=hand_eval.RANK_TABLE_PATH,
+                            help='Where to write the .npy table')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+
+        table = hand_eval.build_rank_table()
+        # Write to a temp file first so running workers never map a partial table
+        tmp_path = output + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, table)
+        os.replace(tmp_path, output)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(table)} entries ({os.path.getsize(output)} bytes) to {output}'
+        ))
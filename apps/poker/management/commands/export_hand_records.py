@@ -0,0 +1,100 @@
+# poker/management/commands/export_hand_records.py
+import csv
+import os
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from apps.poker.cards import to_strs
+from apps.poker.game_engine import ACTION_LETTERS, RAISE_CODE
+from apps.poker.models import HandRecord
+from apps.poker.state_codec import decode_hand_actions
+
+FIELDS = ('id', 'session_id', 'hand', 'button', 'cards', 'street', 'actions', 'pot', 'player_delta', 'winner', 'showdown')
+
+def _action_string(actions):
+    # "0:K 1:R20 0:C" - actor and engine letters per action
+    return ' '.join(
+        f"{actor}:{ACTION_LETTERS[RAISE_CODE]}{code >> 2}" if code & 3 == RAISE_CODE else f"{actor}:{ACTION_LETTERS[code]}"
+        for actor, code in decode_hand_actions(actions)
+    )
+
+def _columns(rows):
+    '''
+    Turns a chunk of value rows into numpy columns. Actions are ragged, so they
+    are stored flat with per-hand offsets: hand i owns codes[offsets[i]:offsets[i + 1]].
+    '''
+    actions = [decode_hand_actions(row[6]) for row in rows]
+    offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([len(hand) for hand in actions], out=offsets[1:])
+    flat = [pair for hand in actions for pair in hand]
+    return {
+        'id': np.array([row[0] for row in rows], dtype=np.int64),
+        'session_id': np.array([str(row[1] or '') for row in rows]),
+        'hand': np.array([row[2] for row in rows], dtype=np.int32),
+        'button': np.array([row[3] for row in rows], dtype=np.int16),
+        'cards': np.frombuffer(b''.join(bytes(row[4]) for row in rows), dtype=np.uint8).reshape(len(rows), 9),
+        'street': np.array([row[5] for row in rows], dtype=np.int8),
+        'action_actors': np.array([actor for actor, _ in flat], dtype=np.int8),
+        'action_codes': np.array([code for _, code in flat], dtype=np.int16),
+        'action_offsets': offsets,
+        'pot': np.array([row[7] for row in rows], dtype=np.int32),
+        'player_delta': np.array([row[8] for row in rows], dtype=np.int32),
+        'winner': np.array([row[9] for row in rows], dtype=np.int8),
+        'showdown': np.array([row[10] for row in rows], dtype=bool),
+    }
+
+class Command(BaseCommand):
+    help = 'Streams hand records to CSV or to columnar NPZ chunks for offline analysis'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='CSV file, or directory for NPZ chunks')
+        parser.add_argument('--format', choices=('npz', 'csv'), default='npz')
+        parser.add_argument('--chunk-size', type=int, default=100000,
+                            help='Hands per NPZ chunk and per database fetch')
+        parser.add_argument('--after-id', type=int, default=0,
+                            help='Only export records with a larger id, for incremental exports')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size <= 0:
+            raise CommandError('--chunk-size must be positive')
+        rows = (HandRecord.objects.filter(id__gt=options['after_id']).order_by('id')
+                .values_list(*FIELDS).iterator(chunk_size=chunk_size))
+
+        if options['format'] == 'csv':
+            count = self._write_csv(rows, options['output'])
+        else:
+            count = self._write_npz(rows, options['output'], chunk_size)
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} hand records to {options['output']}"))
+
+    def _write_csv(self, rows, path):
+        count = 0
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            for row in rows:
+                row = list(row)
+                row[4] = ' '.join(to_strs(bytes(row[4])))
+                row[6] = _action_string(row[6])
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def _write_npz(self, rows, directory, chunk_size):
+        os.makedirs(directory, exist_ok=True)
+        count = 0
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                self._save_chunk(directory, count // chunk_size, chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            self._save_chunk(directory, count // chunk_size, chunk)
+            count += len(chunk)
+        return count
+
+    def _save_chunk(self, directory, index, chunk):
+        path = os.path.join(directory, f'hand_records_{index:05d}.npz')
+        np.savez_compressed(path, **_columns(chunk))
+        self.stdout.write(f"Wrote {len(chunk)} hands to {path}")
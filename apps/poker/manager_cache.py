@@ -0,0 +1,82 @@
+# poker/manager_cache.py
+'''
+Per-worker LRU of live PokerGameManager instances keyed by session_id.
+
+Keeping the manager alive between requests saves rebuilding the ReBeL bot
+and lets it keep what it learned across the hands of a session. A request
+checks a manager out of the cache and returns it when done, so two requests
+for the same session never share one instance. Entries idle for longer than
+MANAGER_IDLE_SECONDS are dropped, and an entry whose GameSession.version no
+longer matches the row (another worker wrote it) reloads the session.
+'''
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from .config import PokerSettings
+from .game_manager import PokerGameManager
+from .models import GameSession
+
+class ManagerCache:
+    def __init__(self, maxsize=PokerSettings.MANAGER_CACHE_SIZE, idle_seconds=PokerSettings.MANAGER_IDLE_SECONDS):
+        self.maxsize = maxsize
+        self.idle_seconds = idle_seconds
+        self._entries = OrderedDict()  # session_id -> (manager, last used time)
+        self._lock = threading.Lock()
+
+    def _evict_idle(self, now):
+        while self._entries:
+            session_id, (_, last_used) = next(iter(self._entries.items()))
+            if now - last_used < self.idle_seconds:
+                break
+            del self._entries[session_id]
+
+    def _take(self, session_id, player):
+        '''
+        Removes and returns the cached manager for a session if it is still current, else None.
+        '''
+        version = GameSession.objects.filter(session_id=session_id, player=player).values_list('version', flat=True).first()
+        if version is None:
+            self.discard(session_id)
+            raise GameSession.DoesNotExist(f"No game session {session_id} for this player")
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return None
+        manager = entry[0]
+        if manager.session.version != version:
+            manager.reload(GameSession.objects.get(session_id=session_id, player=player))
+        return manager
+
+    def _put(self, session_id, manager):
+        with self._lock:
+            self._entries[session_id] = (manager, time.monotonic())
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    @contextmanager
+    def checkout(self, session_id, player):
+        '''
+        Yields the live manager of a session owned by player, building one on a miss.
+        Raises GameSession.DoesNotExist like a direct lookup would.
+        '''
+        session_id = str(session_id)
+        manager = self._take(session_id, player)
+        if manager is None:
+            manager = PokerGameManager(GameSession.objects.get(session_id=session_id, player=player))
+        yield manager
+        # Only reached without an exception: a failed request may leave half-applied
+        # changes on the manager, so it is dropped and the next request starts clean
+        self._put(session_id, manager)
+
+    def discard(self, session_id):
+        with self._lock:
+            self._entries.pop(str(session_id), None)
+
+    def __len__(self):
+        return len(self._entries)
+
+manager_cache = ManagerCache()
@@ -0,0 +1,117 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:46
+
+import struct
+
+from django.db import migrations, models
+
+# A frozen copy of version 1 of apps.poker.state_codec, so this migration keeps
+# writing the blobs it always wrote whatever later codec versions change
+RANKS = '23456789TJQKA'
+SUITS = 'cdhs'
+CARD_STRINGS = tuple(r + s for r in RANKS for s in SUITS)
+CARD_INDEX = {s: i for i, s in enumerate(CARD_STRINGS)}
+HAND_TYPES = ('High Card', 'Pair', 'Two Pair', 'Trips', 'Straight', 'Flush', 'Full House', 'Quads', 'Straight Flush')
+
+VERSION = 1
+HEADER = struct.Struct('<BB')
+TERMINAL_FLAG = 1
+ROUND_FIELDS = (('button', 'H'), ('street', 'B'), ('final_street', 'B'), ('pips', '2h'), ('stacks', '2h'), ('total_pot', 'i'))
+TERMINAL_FIELDS = (('button', 'H'), ('total_pot', 'i'))
+OPTIONAL_FIELDS = ((2, 'outcome', 'b'), (4, 'zobrist', 'Q'), (8, 'deck_seed', 'Q'), (16, 'deltas', '2h'))
+
+
+def to_int(card):
+    return card if isinstance(card, int) else CARD_INDEX[str(card)]
+
+
+def encode_v1(state):
+    terminal = bool(state.get('terminal', False))
+    fields = list(TERMINAL_FIELDS if terminal else ROUND_FIELDS)
+    flags = TERMINAL_FLAG if terminal else 0
+    values = [state.get(key, 0) for key, _ in fields]
+    for flag, key, fmt in OPTIONAL_FIELDS:
+        if state.get(key) is not None:
+            flags |= flag
+            fields.append((key, fmt))
+            values.append(state[key])
+    flat = []
+    for (_, fmt), value in zip(fields, values):
+        if fmt[0].isdigit():
+            flat.extend(value)
+        else:
+            flat.append(value)
+    parts = [HEADER.pack(VERSION, flags), struct.pack('<' + ''.join(fmt for _, fmt in fields), *flat)]
+    if not terminal and state.get('deck_seed') is None:
+        hands = [to_int(card) for hand in state['hands'] for card in hand]
+        deck = [to_int(card) for card in state['deck']]
+        parts.append(bytes([len(hands)] + hands + [len(deck)] + deck))
+    hand_types = [HAND_TYPES.index(name) for name in state.get('hand_types', [])]
+    parts.append(bytes([len(hand_types)] + hand_types))
+    return b''.join(parts)
+
+
+def decode_v1(data):
+    data = bytes(data)
+    version, flags = HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f"Cannot revert game state codec version {version} to JSON in this migration")
+    terminal = bool(flags & TERMINAL_FLAG)
+    fields = (TERMINAL_FIELDS if terminal else ROUND_FIELDS) + tuple(
+        (key, fmt) for flag, key, fmt in OPTIONAL_FIELDS if flags & flag)
+    layout = struct.Struct('<' + ''.join(fmt for _, fmt in fields))
+    flat = layout.unpack_from(data, HEADER.size)
+    state = {'terminal': terminal}
+    position = 0
+    for key, fmt in fields:
+        if fmt[0].isdigit():
+            count = int(fmt[:-1])
+            state[key] = list(flat[position:position + count])
+            position += count
+        else:
+            state[key] = flat[position]
+            position += 1
+    if terminal and 'deltas' not in state:
+        state['deltas'] = None
+    position = HEADER.size + layout.size
+    if not terminal and 'deck_seed' not in state:
+        count = data[position]
+        hands = [CARD_STRINGS[card] for card in data[position + 1:position + 1 + count]]
+        position += 1 + count
+        count = data[position]
+        state['hands'] = [hands[i:i + 2] for i in range(0, len(hands), 2)]
+        state['deck'] = [CARD_STRINGS[card] for card in data[position + 1:position + 1 + count]]
+        position += 1 + count
+    count = data[position]
+    state['hand_types'] = [HAND_TYPES[index] for index in data[position + 1:position + 1 + count]]
+    return state
+
+
+def encode_json_states(apps, schema_editor):
+    GameSession = apps.get_model('poker', 'GameSession')
+    for session in GameSession.objects.exclude(game_state={}).iterator():
+        session.game_state_data = encode_v1(session.game_state)
+        session.game_state = {}
+        session.save(update_fields=['game_state', 'game_state_data'])
+
+
+def decode_binary_states(apps, schema_editor):
+    GameSession = apps.get_model('poker', 'GameSession')
+    for session in GameSession.objects.exclude(game_state_data=b'').iterator():
+        session.game_state = decode_v1(session.game_state_data)
+        session.save(update_fields=['game_state'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poker', '0007_remove_availablegame_bot_code_availablegame_bot_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='game_state_data',
+            field=models.BinaryField(blank=True, default=b''),
+        ),
+        migrations.RunPython(encode_json_states, decode_binary_states),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poker', '0008_gamesession_game_state_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
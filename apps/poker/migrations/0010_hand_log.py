@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poker', '0009_gamesession_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='hands_logged',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='log_sequence',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='HandAction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.PositiveIntegerField()),
+                ('hand', models.PositiveIntegerField()),
+                ('actor', models.PositiveSmallIntegerField(choices=[(0, 'Player'), (1, 'Bot')])),
+                ('street', models.PositiveSmallIntegerField()),
+                ('code', models.IntegerField()),
+                ('total_pot', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hand_actions', to='poker.gamesession')),
+            ],
+            options={
+                'db_table': 'hand_actions',
+                'ordering': ['session', 'sequence'],
+                'constraints': [models.UniqueConstraint(fields=('session', 'sequence'), name='unique_hand_action_sequence')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HandSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hand', models.PositiveIntegerField()),
+                ('sequence', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hand_snapshots', to='poker.gamesession')),
+            ],
+            options={
+                'db_table': 'hand_snapshots',
+                'ordering': ['session', 'hand', 'sequence'],
+                'constraints': [models.UniqueConstraint(fields=('session', 'hand', 'sequence'), name='unique_hand_snapshot')],
+            },
+        ),
+    ]
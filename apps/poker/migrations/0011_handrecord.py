@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poker', '0010_hand_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HandRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hand', models.PositiveIntegerField()),
+                ('button', models.PositiveSmallIntegerField()),
+                ('cards', models.BinaryField()),
+                ('street', models.PositiveSmallIntegerField()),
+                ('actions', models.BinaryField()),
+                ('pot', models.IntegerField()),
+                ('player_delta', models.IntegerField()),
+                ('winner', models.PositiveSmallIntegerField(choices=[(0, 'Player'), (1, 'Bot'), (2, 'Split')])),
+                ('showdown', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('session', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='hand_records', to='poker.gamesession')),
+            ],
+            options={
+                'db_table': 'hand_records',
+                'ordering': ['id'],
+            },
+        ),
+    ]
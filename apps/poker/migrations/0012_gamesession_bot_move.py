@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poker', '0011_handrecord'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='bot_move_result',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='bot_move_started',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
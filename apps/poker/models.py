@@ -3,6 +3,7 @@ from django.db import models
 import uuid
 from django.core.exceptions import ValidationError
 from apps.users.models import CustomUser
+from .state_codec import encode_game_state, decode_game_state, decode_hand_actions
 
 class BotRepository(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4)
@@ -95,6 +96,16 @@ class GameSession(models.Model):
     board_cards = models.JSONField(default=list)
     deck_state = models.JSONField(default=dict)
     game_state = models.JSONField(default=dict)
+    # Binary form of game_state (see state_codec.py); game_state is only read for rows saved before it
+    game_state_data = models.BinaryField(default=b'', blank=True)
+    # Bumped on every manager flush so cached managers can tell when their copy is stale
+    version = models.PositiveIntegerField(default=0)
+    # Hands started, and actions written to the hand action log (see HandAction)
+    hands_logged = models.PositiveIntegerField(default=0)
+    log_sequence = models.PositiveIntegerField(default=0)
+    # Set while a deferred bot move is pending; its response is kept for the poll (see bot_moves.py)
+    bot_move_started = models.DateTimeField(null=True, blank=True)
+    bot_move_result = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     current_coins = models.IntegerField(default=0)
     available_game = models.ForeignKey(AvailableGame, on_delete=models.SET_NULL, null=True)
@@ -106,6 +117,90 @@ class GameSession(models.Model):
     class Meta:
         db_table = 'game_sessions'
 
+    def load_game_state(self):
+        if self.game_state_data:
+            return decode_game_state(self.game_state_data)
+        return self.game_state
+
+    def store_game_state(self, state):
+        self.game_state_data = encode_game_state(state)
+        self.game_state = {}
+
+class HandAction(models.Model):
+    ACTORS = (
+        (0, 'Player'),
+        (1, 'Bot'),
+    )
+
+    session = models.ForeignKey(GameSession, on_delete=models.CASCADE, related_name='hand_actions')
+    sequence = models.PositiveIntegerField()  # Monotonic per session, never reused
+    hand = models.PositiveIntegerField()
+    actor = models.PositiveSmallIntegerField(choices=ACTORS)
+    street = models.PositiveSmallIntegerField()
+    code = models.IntegerField()  # game_engine.encode_action
+    total_pot = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'hand_actions'
+        ordering = ['session', 'sequence']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['session', 'sequence'],
+                name='unique_hand_action_sequence'
+            )
+        ]
+
+class HandSnapshot(models.Model):
+    session = models.ForeignKey(GameSession, on_delete=models.CASCADE, related_name='hand_snapshots')
+    hand = models.PositiveIntegerField()
+    sequence = models.PositiveIntegerField()  # Last action applied to the state
+    data = models.BinaryField()  # state_codec blob
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'hand_snapshots'
+        ordering = ['session', 'hand', 'sequence']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['session', 'hand', 'sequence'],
+                name='unique_hand_snapshot'
+            )
+        ]
+
+    def load_game_state(self):
+        return decode_game_state(self.data)
+
+class HandRecord(models.Model):
+    WINNERS = (
+        (0, 'Player'),
+        (1, 'Bot'),
+        (2, 'Split'),
+    )
+
+    session = models.ForeignKey(GameSession, on_delete=models.SET_NULL, null=True, related_name='hand_records')
+    hand = models.PositiveIntegerField()
+    button = models.PositiveSmallIntegerField()
+    # Card ints: player hole cards, bot hole cards, then the five board cards of the deal
+    cards = models.BinaryField()
+    street = models.PositiveSmallIntegerField()  # Board cards shown when the hand ended
+    actions = models.BinaryField()  # state_codec.encode_hand_actions
+    pot = models.IntegerField()  # Chips awarded
+    player_delta = models.IntegerField()
+    winner = models.PositiveSmallIntegerField(choices=WINNERS)
+    showdown = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'hand_records'
+        ordering = ['id']
+
+    def card_list(self):
+        return list(bytes(self.cards))
+
+    def action_list(self):
+        return decode_hand_actions(self.actions)
+
 class UserCode(models.Model):
     user = models.ForeignKey('users.CustomUser', on_delete=models.CASCADE)
     title = models.CharField(max_length=255)
@@ -0,0 +1,163 @@
+# poker/preflop.py
+'''
+Precomputed preflop equities for the 169 canonical starting hands.
+
+A starting hand's class index is hi * 13 + lo for suited hands and pairs
+and lo * 13 + hi for offsuit hands, where hi >= lo are the card ranks, so
+the 13x13 grid holds suited hands above the diagonal and offsuit below.
+
+The table ships as a small .npz of uint16 equities (scaled by 65535):
+'vs_random' (169,) against a uniformly random hand and 'matchups'
+(169, 169) where matchups[i, j] is class i's equity against class j.
+Regenerate it with `manage.py build_preflop_table`.
+'''
+import os
+import numpy as np
+
+from .cards import RANKS, NUM_CARDS, to_ints
+from .hand_eval import evaluate_batch
+
+NUM_CLASSES = 169
+EQUITY_SCALE = 65535
+PREFLOP_TABLE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'preflop.npz')
+
+def hand_class(hole):
+    '''
+    Returns the canonical class index (0..168) of two hole cards.
+    '''
+    a, b = to_ints(hole)
+    hi, lo = max(a >> 2, b >> 2), min(a >> 2, b >> 2)
+    if hi == lo or (a & 3) == (b & 3):
+        return hi * 13 + lo
+    return lo * 13 + hi
+
+def class_label(index):
+    '''
+    Returns the usual name of a class index, e.g. "AKs", "T9o" or "77".
+    '''
+    row, col = divmod(index, 13)
+    if row == col:
+        return RANKS[row] * 2
+    if row > col:
+        return RANKS[row] + RANKS[col] + 's'
+    return RANKS[col] + RANKS[row] + 'o'
+
+def _build_class_combos():
+    '''
+    Lists the concrete two-card combos of every class (6 for pairs, 4 suited, 12 offsuit),
+    padded into one (169, 12, 2) array with a per-class count.
+    '''
+    combos = [[] for _ in range(NUM_CLASSES)]
+    for a in range(NUM_CARDS):
+        for b in range(a + 1, NUM_CARDS):
+            combos[hand_class([a, b])].append((a, b))
+    counts = np.array([len(c) for c in combos])
+    table = np.zeros((NUM_CLASSES, counts.max(), 2), dtype=np.intp)
+    for index, c in enumerate(combos):
+        table[index, :len(c)] = c
+    return table, counts
+
+CLASS_COMBOS, CLASS_COMBO_COUNTS = _build_class_combos()
+# Rows of simulated matchups per evaluator call
+MATCHUP_BATCH = 200000
+
+def _draw_combos(rng, classes):
+    '''
+    Draws one random concrete combo per entry of a class index array.
+    '''
+    return CLASS_COMBOS[classes, rng.integers(CLASS_COMBO_COUNTS[classes])]
+
+def _random_boards(rng, dead):
+    '''
+    Deals five board cards per row, avoiding each row's dead cards.
+    '''
+    keys = rng.random((len(dead), NUM_CARDS))
+    np.put_along_axis(keys, dead, 2.0, axis=1)
+    return np.argpartition(keys, 5, axis=1)[:, :5]
+
+def _showdown_points(rng, hero, villain):
+    '''
+    Deals a random board to each (hero, villain) row and returns 2 per hero win and 1 per tie.
+    '''
+    boards = _random_boards(rng, np.hstack([hero, villain]))
+    hero_values = evaluate_batch(np.hstack([hero, boards]))
+    villain_values = evaluate_batch(np.hstack([villain, boards]))
+    return 2 * (hero_values > villain_values) + (hero_values == villain_values)
+
+def simulate_vs_random(index, iters, seed=None):
+    '''
+    Monte Carlo equity of class index against a uniformly random hand.
+    '''
+    rng = np.random.default_rng(seed)
+    points = 0
+    for start in range(0, iters, MATCHUP_BATCH):
+        rows = min(MATCHUP_BATCH, iters - start)
+        hero = _draw_combos(rng, np.full(rows, index))
+        # Villain cards are two distinct draws from the 50 cards the hero does not hold
+        keys = rng.random((rows, NUM_CARDS))
+        np.put_along_axis(keys, hero, 2.0, axis=1)
+        villain = np.argpartition(keys, 2, axis=1)[:, :2]
+        points += int(_showdown_points(rng, hero, villain).sum())
+    return points / (2 * iters)
+
+def simulate_matchups(index, iters, seed=None):
+    '''
+    Monte Carlo equities of class index against every class, as a (169,) row.
+    Combos that share a card are redrawn, so each matchup averages over the
+    non-conflicting combo pairs only.
+    '''
+    rng = np.random.default_rng(seed)
+    scores = np.zeros(NUM_CLASSES)
+    per_batch = max(1, MATCHUP_BATCH // iters)
+    for start in range(0, NUM_CLASSES, per_batch):
+        others = np.arange(start, min(start + per_batch, NUM_CLASSES))
+        villain_classes = np.repeat(others, iters)
+        hero_classes = np.full(len(villain_classes), index)
+        hero = _draw_combos(rng, hero_classes)
+        villain = _draw_combos(rng, villain_classes)
+        conflict = (hero[:, :, None] == villain[:, None, :]).any(axis=(1, 2))
+        while conflict.any():
+            hero[conflict] = _draw_combos(rng, hero_classes[conflict])
+            villain[conflict] = _draw_combos(rng, villain_classes[conflict])
+            conflict = (hero[:, :, None] == villain[:, None, :]).any(axis=(1, 2))
+
+        points = _showdown_points(rng, hero, villain)
+        scores[others] = points.reshape(len(others), iters).sum(axis=1)
+    return scores / (2 * iters)
+
+def save_table(vs_random, matchups, path=PREFLOP_TABLE_PATH):
+    '''
+    Quantizes equities to uint16 and writes the table artifact.
+    '''
+    quantize = lambda equity: np.rint(np.asarray(equity) * EQUITY_SCALE).astype(np.uint16)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, vs_random=quantize(vs_random), matchups=quantize(matchups))
+    os.replace(tmp_path, path)
+
+def load_table(path=PREFLOP_TABLE_PATH):
+    '''
+    Loads (vs_random, matchups) as uint16 arrays, or None if the artifact is missing.
+    '''
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return data['vs_random'], data['matchups']
+
+_TABLE = load_table()
+
+def preflop_equity(hole):
+    '''
+    Returns the table equity of hole against a random hand, or None without a table.
+    '''
+    if _TABLE is None:
+        return None
+    return _TABLE[0][hand_class(hole)] / EQUITY_SCALE
+
+def preflop_matchup(hole, opp_hole):
+    '''
+    Returns the table equity of hole's class against opp_hole's class, or None without a table.
+    '''
+    if _TABLE is None:
+        return None
+    return _TABLE[1][hand_class(hole), hand_class(opp_hole)] / EQUITY_SCALE
@@ -1,4 +1,12 @@
 from apps.poker.game_engine import FoldAction, CallAction, CheckAction, RaiseAction
+from apps.poker.game_engine import ACTION_CODES, ACTION_NAMES, CALL_BIT, CHECK_BIT, RAISE_BIT
+from apps.poker.cards import CARDS, NUM_CARDS, to_ints
+from apps.poker.hand_eval import evaluate_batch
+from apps.poker.equity import exact_equity, enumeration_cost
+from apps.poker.preflop import preflop_equity
+from apps.poker.isomorphism import board_index
+from apps.poker.combos import NUM_COMBOS, blocker_mask, combo_index
+from .solver import DECISION, SubgameSolver
 from .skeleton.states import GameState, TerminalState, RoundState
 from .skeleton.states import NUM_ROUNDS, STARTING_STACK, BIG_BLIND, SMALL_BLIND
 from .skeleton.bot import Bot
@@ -10,14 +18,47 @@ import numpy as np
 from collections import defaultdict
 
 class PublicBelief:
-    """Represents a public belief state in the game"""
-    def __init__(self, street, board_cards, pot, active_player):
+    """
+    Represents a public belief state in the game: the public state plus each player's range,
+    a probability vector over the NUM_COMBOS hole-card combos indexed as in apps.poker.combos
+    """
+    def __init__(self, street, board_cards, pot, active_player, zobrist=None, ranges=None):
         self.street = street
         self.board_cards = board_cards
         self.pot = pot
         self.active_player = active_player
+        self.zobrist = zobrist # 64-bit public state hash when the engine state carries one
         self.value = 0
         self.policy = defaultdict(float)
+        self.ranges = np.full((2, NUM_COMBOS), 1 / NUM_COMBOS) if ranges is None else ranges # (2, NUM_COMBOS), rows sum to 1
+        self.mask_blockers(board_cards)
+
+    def copy(self):
+        """A belief that can be updated without touching this one"""
+        return PublicBelief(self.street, list(self.board_cards), self.pot, self.active_player, self.zobrist, self.ranges.copy())
+
+    def mask_blockers(self, cards):
+        """Zeroes every combo holding one of the cards in both ranges at once"""
+        if len(cards):
+            self.ranges = self._normalized(self.ranges * blocker_mask(to_ints(cards)))
+
+    def update(self, player, action_probs):
+        """
+        Bayes' rule after player acted: P(hand | action) is proportional to
+        π(action | hand) P(hand), with action_probs the policy's probability of
+        the observed action for every combo
+        """
+        ranges = self.ranges.copy()
+        ranges[player] *= action_probs
+        self.ranges = self._normalized(ranges)
+
+    def _normalized(self, ranges):
+        totals = ranges.sum(axis=1, keepdims=True)
+        # A range the updates emptied (the policy gave the action zero weight everywhere)
+        # falls back to uniform over the combos the board leaves possible
+        live = blocker_mask(to_ints(self.board_cards))
+        uniform = live / np.count_nonzero(live)
+        return np.where(totals > 0, ranges / np.where(totals > 0, totals, 1), uniform)
 
 class ReBeL(Bot):
     def __init__(self):
@@ -25,16 +66,29 @@ class ReBeL(Bot):
         Maps to initialization in REBEL-LINEAR-CFR-D
         - value_net corresponds to v in the algorithm
         - policy_net corresponds to π in the algorithm
-        - t_warm = 1000 maps to twarm initialization
+        - t_warm maps to twarm initialization
+        - training_iters maps to T, the CFR iterations of a subgame solve
         - epsilon = 0.25 maps to ε in SAMPLELEAF function
         """
         super().__init__()
         self.value_net = defaultdict(float) # Value network v(r)
         self.policy_net = defaultdict(lambda: defaultdict(float)) # Policy network π
-        self.t_warm = 1000 # twarm initialization, num of iters algo uses for basic policy generation
-        self.training_iters = 10000 # T in the pseudocode
+        self.t_warm = 8 # twarm initialization, early CFR iterations left out of the average policy
+        self.training_iters = 100 # T in the pseudocode, CFR iterations per subgame with the fixed budget
+        self.use_solver = True # play postflop streets from a linear CFR solve instead of strength thresholds
+        self.solver_batch = 4 # CFR iterations added per anytime refinement step
         self.epsilon = 0.25 # ε from SAMPLELEAF
         self.discount = 0.99 # discount factor, 0 to 1, causes bot to care almost equally about immediate and future rewards
+        self.vectorized_strength = True # score all Monte Carlo samples in one NumPy batch instead of an eval7 loop
+        self.strength_iters = 10000 # Monte Carlo iterations per decision with the vectorized estimator; up from the eval7 loop's 100 at about the same cost, so estimates are steadier and play changes
+        self.strength_batch = 2000 # Monte Carlo iterations added per anytime refinement step
+        self.max_strength_iters = 200000 # anytime refinement stops here even with time left
+        self.strength_cache = None # (hole, board, score, iters) of the street being played, see begin_action; only sampled streets use it, so the flop and turn with use_solver off
+        self.exact_strength = True # enumerate exactly whenever that takes fewer evaluations than sampling
+        self.public_belief = None # PBS of the hand being played, its ranges updated after every observed action
+        self.belief_hand = None # our hole cards in the hand public_belief tracks
+        self.belief_node = None # (solver, node) our last solved action led to, to read the opponent's reply
+        self.rng = np.random.default_rng()
         
     def handle_new_round(self, game_state, round_state, active):
         """
@@ -45,13 +99,64 @@ class ReBeL(Bot):
         self.round_num = game_state.round_num
         self.my_cards = round_state.hands[active]
         self.big_blind = bool(active)
+        self.public_belief = None
+        self.belief_node = None
 
-    def get_public_state(self, round_state, active):
-        """Convert RoundState to a public belief state"""
+    def get_public_state(self, round_state, active, ranges=None):
+        """Convert RoundState to a public belief state, with uniform ranges unless given"""
         street = round_state.street
         board_cards = round_state.deck[:street] if street > 0 else []
         pot = sum(STARTING_STACK - stack for stack in round_state.stacks)
-        return PublicBelief(street, board_cards, pot, active)
+        return PublicBelief(street, board_cards, pot, active, getattr(round_state, 'zobrist', None), ranges)
+
+    def track_belief(self, round_state, active):
+        """
+        Brings the hand's PBS up to round_state. A new hand starts from uniform ranges; within
+        a hand the ranges carry over, updated with the opponent's latest action, and any new
+        board cards are masked out of both.
+        """
+        ranges = None
+        if (self.public_belief is not None and self.belief_hand == tuple(round_state.hands[active])
+                and self.public_belief.street <= round_state.street):
+            ranges = self.observe_opponent(round_state, active).ranges
+        self.public_belief = self.get_public_state(round_state, active, ranges)
+        self.belief_hand = tuple(round_state.hands[active])
+        self.belief_node = None
+        return self.public_belief
+
+    def observe_opponent(self, round_state, active):
+        """
+        Opponent modeling: weighs the opponent's range by the probability the solver's policy
+        gave the action they took after our last solved decision. Returns an updated copy of
+        the PBS, unchanged when that action cannot be matched to round_state.
+        """
+        public_belief = self.public_belief.copy()
+        if self.belief_node is None:
+            return public_belief
+        solver, node = self.belief_node
+        if node.kind != DECISION or node.player == active:
+            return public_belief
+        if round_state.street != node.state.street:
+            observed = CheckAction() if any(isinstance(action, CheckAction) for action in node.actions) else CallAction()
+        else:
+            observed = RaiseAction(round_state.pips[1-active])
+        # Only trust the node if the observed action leads from it to exactly this state
+        next_state = node.state.proceed(observed)
+        if (hasattr(next_state, 'deltas') or next_state.street != round_state.street
+                or list(next_state.stacks) != list(round_state.stacks)):
+            return public_belief
+        index = solver.match_action(node, observed)
+        if index is not None:
+            public_belief.update(1 - active, solver.average_strategy(node)[index])
+        return public_belief
+
+    def public_key(self, public_belief):
+        """
+        Table key of a public belief state. Boards are keyed by their suit-isomorphic
+        index, so boards that differ only by a suit relabeling share one entry.
+        """
+        return (public_belief.street, board_index(public_belief.board_cards),
+                public_belief.pot, public_belief.active_player)
 
     def update_value(self, public_belief, new_value):
         """
@@ -59,8 +164,7 @@ class ReBeL(Bot):
         - Updates v(r) based on observed outcomes
         - Uses exponential moving average for updates
         """
-        key = (public_belief.street, tuple(public_belief.board_cards), 
-               public_belief.pot, public_belief.active_player)
+        key = self.public_key(public_belief)
         self.value_net[key] = (1 - 0.1) * self.value_net[key] + 0.1 * new_value
 
     def update_policy(self, public_belief, action_type, prob):
@@ -69,21 +173,13 @@ class ReBeL(Bot):
         - Updates π based on observed actions and outcomes
         - Uses exponential moving average for updates
         """
-        key = (public_belief.street, tuple(public_belief.board_cards),
-               public_belief.pot, public_belief.active_player)
+        key = self.public_key(public_belief)
         self.policy_net[key][action_type] = (1 - 0.1) * self.policy_net[key][action_type] + 0.1 * prob
 
     def get_action_type(self, action):
         """Get the type of an action instance"""
-        if isinstance(action, FoldAction):
-            return "fold"
-        elif isinstance(action, CallAction):
-            return "call"
-        elif isinstance(action, CheckAction):
-            return "check"
-        elif isinstance(action, RaiseAction):
-            return "raise"
-        return None
+        code = ACTION_CODES.get(type(action))
+        return ACTION_NAMES[code] if code is not None else None
 
     def create_action(self, action_type, round_state=None):
         """Create an action instance from type"""
@@ -103,23 +199,22 @@ class ReBeL(Bot):
         Estimates poker hand strength through Monte Carlo simulation by sampling random opponent hands.
         Simulates 'iters' number of scenarios, comparing our hand against random opponent hands. 
         Args:
-            hole (list): Our two hole cards (e.g. ["As", "Kh"])
+            hole (list): Our two hole cards as ints (e.g. [51, 46] for As Kh)
             iters (int): Number of Monte Carlo iterations to run
-            community (list): Currently visible community cards, empty for preflop (e.g. ["Jd", "Td", "4s"])
+            community (list): Currently visible community cards as ints, empty for preflop
         Returns:
             float: Hand strength score between 0-1, where 1.0 = always winning, 0.5 = equal chances,
                     0.0 = always losing. Calculated as (wins + 0.5*ties)/iterations.
         """
-        deck = eval7.Deck()
-        hole_cards = [eval7.Card(card) for card in hole]
+        hole = to_ints(hole)
+        community = to_ints(community)
+        hole_cards = [CARDS[card] for card in hole]
+        community_cards = [CARDS[card] for card in community]
         
-        if community:
-            community_cards = [eval7.Card(card) for card in community]
-            for card in community_cards:
-                deck.cards.remove(card)
-                
-        for card in hole_cards:
-            deck.cards.remove(card)
+        # Build the remaining deck from the interned cards instead of removing parsed ones
+        dead = set(hole) | set(community)
+        deck = eval7.Deck()
+        deck.cards = [CARDS[card] for card in range(NUM_CARDS) if card not in dead]
             
         score = 0
         for _ in range(iters):
@@ -130,8 +225,8 @@ class ReBeL(Bot):
             opp_hole = draw[:2]
             alt_community = draw[2:]
             
-            our_hand = hole_cards + (community_cards if community else []) + alt_community
-            opp_hand = opp_hole + (community_cards if community else []) + alt_community
+            our_hand = hole_cards + community_cards + alt_community
+            opp_hand = opp_hole + community_cards + alt_community
             
             our_value = eval7.evaluate(our_hand)
             opp_value = eval7.evaluate(opp_hand)
@@ -140,43 +235,208 @@ class ReBeL(Bot):
             
         return score / (2 * iters)
 
+    def calc_hand_strength_vectorized(self, hole, iters, community=[]):
+        """
+        NumPy counterpart of calc_hand_strength with the same arguments and result.
+        Draws every opponent hand and runout at once as an (iters, k) matrix sampled
+        without replacement from the live cards, then scores all samples in bulk.
+        """
+        hole = to_ints(hole)
+        community = to_ints(community)
+        dead = set(hole) | set(community)
+        live = np.array([card for card in range(NUM_CARDS) if card not in dead], dtype=np.uint8)
+        
+        # Each shuffled copy of the live deck is cut into several disjoint k-card draws,
+        # so every row is a uniform sample without replacement
+        k = 2 + 5 - len(community)
+        per_deck = len(live) // k
+        keys = self.rng.random((-(-iters // per_deck), len(live)), dtype=np.float32)
+        decks = live[np.argsort(keys, axis=1)]
+        draws = decks[:, :per_deck * k].reshape(-1, k)[:iters]
+        opp_hole = draws[:, :2]
+        alt_community = draws[:, 2:]
+        
+        known = np.broadcast_to(np.array(hole + community, dtype=np.uint8), (iters, 2 + len(community)))
+        shared = np.broadcast_to(np.array(community, dtype=np.uint8), (iters, len(community)))
+        our_values = evaluate_batch(np.hstack([known, alt_community]))
+        opp_values = evaluate_batch(np.hstack([opp_hole, shared, alt_community]))
+        
+        score = 2 * np.count_nonzero(our_values > opp_values) + np.count_nonzero(our_values == opp_values)
+        return score / (2 * iters)
+
+    def calc_exact_strength(self, hole, community):
+        """
+        Exact counterpart of calc_hand_strength: enumerates every opponent holding and runout.
+        Results are cached on the suit-canonical (hole, board), so repeats are free.
+        """
+        return exact_equity(hole, community)
+
+    def known_strength(self, hole, community):
+        """
+        Strength that needs no sampling: the precomputed table preflop, or exact enumeration
+        when it needs fewer evaluations than the Monte Carlo sample. None otherwise.
+        """
+        if not community:
+            strength = preflop_equity(hole)
+            if strength is not None:
+                return strength
+        if self.exact_strength and community and enumeration_cost(len(community)) <= 2 * self.strength_iters:
+            return self.calc_exact_strength(hole, community)
+        return None
+
+    def sample_strength(self, hole, iters, community):
+        """Monte Carlo strength over iters samples with the configured sampler"""
+        if self.vectorized_strength:
+            return self.calc_hand_strength_vectorized(hole, iters, community)
+        return self.calc_hand_strength(hole, iters, community)
+
+    def estimate_strength(self, hole, community):
+        """
+        Picks the cheapest strength estimate for this street: a known strength when there is one,
+        otherwise the configured sampler.
+        """
+        strength = self.known_strength(hole, community)
+        if strength is not None:
+            return strength
+        return self.sample_strength(hole, self.strength_iters if self.vectorized_strength else 100, community)
+
+    def begin_action(self, game_state, round_state, active):
+        """
+        Starts an anytime decision. A known strength is final at once; otherwise the estimate
+        continues from the samples earlier decisions drew for the same hole cards and board,
+        and each refine() adds another batch. A new board starts the estimate over.
+        Postflop, with use_solver, the decision is a linear CFR solve of the street instead
+        and each refine() runs another solver_batch iterations.
+        """
+        my_cards = round_state.hands[active]
+        board_cards = round_state.deck[:round_state.street] if round_state.street > 0 else []
+        self.track_belief(round_state, active)
+        if self.use_solver and round_state.street > 0:
+            self.decision = {
+                'round_state': round_state,
+                'active': active,
+                'hole': my_cards,
+                'board': board_cards,
+                'solver': self.build_solver(round_state, active),
+                'sampled': False,
+            }
+            self.refine()
+            return True
+        strength = self.known_strength(my_cards, board_cards)
+        score, iters = 0.0, 0
+        if strength is None and self.strength_cache is not None:
+            cached_hole, cached_board, cached_score, cached_iters = self.strength_cache
+            if cached_hole == tuple(my_cards) and cached_board == tuple(board_cards):
+                score, iters = cached_score, cached_iters
+                strength = score / iters
+        self.decision = {
+            'round_state': round_state,
+            'hole': my_cards,
+            'board': board_cards,
+            'strength': strength,
+            'sampled': iters > 0 or strength is None,
+            'score': score,
+            'iters': iters,
+            'solver': None,
+        }
+        if strength is None:
+            self.refine()
+        return True
+
+    def build_solver(self, round_state, active):
+        """
+        Maps to the subgame of REBEL-LINEAR-CFR-D: the rest of the current street from the
+        PBS, rooted at the ranges the hand's PBS holds
+        """
+        public_belief = self.public_belief
+        pot = max(0, public_belief.pot - sum(round_state.pips))
+        return SubgameSolver(round_state, public_belief.ranges, pot, t_warm=self.t_warm)
+
+    def refine(self, iters=None):
+        """
+        Adds a batch of Monte Carlo samples to the current decision's strength estimate,
+        or solver_batch CFR iterations when the decision is solved
+        """
+        decision = self.decision
+        solver = decision['solver']
+        if solver is not None:
+            solver.solve(iters or self.solver_batch)
+            return solver.iterations < self.training_iters
+        if not decision['sampled'] or decision['iters'] >= self.max_strength_iters:
+            return False
+        batch = self.strength_batch if self.vectorized_strength else 100
+        iters = min(iters or batch, self.max_strength_iters - decision['iters'])
+        strength = self.sample_strength(decision['hole'], iters, decision['board'])
+        decision['score'] += strength * iters
+        decision['iters'] += iters
+        decision['strength'] = decision['score'] / decision['iters']
+        # Replaced rather than updated in place, so copies of the bot never share an entry
+        self.strength_cache = (tuple(decision['hole']), tuple(decision['board']), decision['score'], decision['iters'])
+        return decision['iters'] < self.max_strength_iters
+
     def get_action(self, game_state, round_state, active):
+        """
+        Decides with the fixed sample budget: strength_iters samples (100 with the eval7 loop),
+        or one more batch on top of the samples already cached for this street.
+        A solved decision runs training_iters CFR iterations.
+        """
+        self.begin_action(game_state, round_state, active)
+        solver = self.decision['solver']
+        if solver is not None:
+            solver.solve(self.training_iters - solver.iterations)
+            return self.best_action()
+        base = self.strength_iters if self.vectorized_strength else 100
+        target = min(max(base, self.decision['iters'] + min(self.strength_batch, base)), self.max_strength_iters)
+        while self.decision['sampled'] and self.decision['iters'] < target:
+            self.refine(target - self.decision['iters'])
+        return self.best_action()
+
+    def best_action(self):
         """
         Maps to SAMPLELEAF function in the algorithm
         - Implements the action selection logic based on:
           * Current PBS (public belief state)
           * Hand strength (part of COMPUTEEV)
           * Exploration (ε-greedy) from SAMPLELEAF
+        A solved decision samples from the solver's average policy for our hand instead,
+        and updates our own range in the PBS with that policy.
         """
-        legal_actions = round_state.legal_actions()
-        public_belief = self.get_public_state(round_state, active)
-        
+        round_state = self.decision['round_state']
+        solver = self.decision['solver']
+        if solver is not None:
+            strategy = solver.average_strategy()
+            probs = strategy[:, combo_index(to_ints(self.decision['hole']))]
+            index = self.rng.choice(len(probs), p=probs / probs.sum())
+            public_belief = self.public_belief.copy()
+            public_belief.update(self.decision['active'], strategy[index])
+            self.public_belief = public_belief
+            self.belief_node = (solver, solver.root.children[index])
+            return solver.root.actions[index]
+        legal_mask = round_state.legal_mask()
         # Calculate EV through hand strength (COMPUTEEV)
-        my_cards = round_state.hands[active]
-        board_cards = round_state.deck[:public_belief.street] if public_belief.street > 0 else []
-        hand_strength = self.calc_hand_strength(my_cards, 100, board_cards)
+        hand_strength = self.decision['strength']
         
         # Exploration (ε = 0.25) maps to SAMPLELEAF's uniform random action selection
         if random.random() < self.epsilon:  # "if i == i* and c < ε then"
             # Uniform random action selection based on hand strength thresholds
-            if hand_strength > 0.7 and RaiseAction in legal_actions:
+            if hand_strength > 0.7 and legal_mask & RAISE_BIT:
                 min_raise, max_raise = round_state.raise_bounds()
                 return RaiseAction(min_raise)
-            elif hand_strength > 0.5 and CallAction in legal_actions:
+            elif hand_strength > 0.5 and legal_mask & CALL_BIT:
                 return CallAction()
-            elif CheckAction in legal_actions:
+            elif legal_mask & CHECK_BIT:
                 return CheckAction()
             else:
                 return FoldAction()
         
         # Exploitation maps to "sample an action ai according to πi(si(h))"
-        if hand_strength > 0.8 and RaiseAction in legal_actions:
+        if hand_strength > 0.8 and legal_mask & RAISE_BIT:
             min_raise, max_raise = round_state.raise_bounds()
             raise_amount = min(max_raise, int(min_raise * 2.5))
             return RaiseAction(raise_amount)
-        elif hand_strength > 0.6 and CallAction in legal_actions:
+        elif hand_strength > 0.6 and legal_mask & CALL_BIT:
             return CallAction()
-        elif CheckAction in legal_actions:
+        elif legal_mask & CHECK_BIT:
             return CheckAction()
         else:
             return FoldAction()
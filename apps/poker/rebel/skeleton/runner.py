@@ -3,11 +3,25 @@ Infrastructure for interacting with the engine
 '''
 import argparse
 import socket
-from apps.poker.game_engine import FoldAction, CallAction, CheckAction, RaiseAction
+import time
+from apps.poker.game_engine import FoldAction, CallAction, CheckAction, RaiseAction, action_letters
+from apps.poker.cards import to_ints
 from .states import GameState, TerminalState, RoundState
-from .states import STARTING_STACK, BIG_BLIND, SMALL_BLIND
+from .states import NUM_ROUNDS, STARTING_STACK, BIG_BLIND, SMALL_BLIND
 from .bot import Bot
 
+
+ACTIONS_PER_ROUND = 4  # expected decisions per round when spreading the game clock
+CLOCK_SHARE = 0.5  # fraction of an action's share of the clock the bot may spend, the rest is slack
+
+
+def action_budget(game_state):
+    '''
+    Seconds the bot may think about one action, from the game clock it has left.
+    '''
+    actions_left = max(1, NUM_ROUNDS - game_state.round_num + 1) * ACTIONS_PER_ROUND
+    return CLOCK_SHARE * max(0., game_state.game_clock) / actions_left
+
 class Runner():
     '''
     Interacts with the engine
@@ -30,15 +44,7 @@ class Runner():
         '''
         Encodes an action and sends it to the engine
         '''
-        if isinstance(action, FoldAction):
-            code = 'F'
-        elif isinstance(action, CallAction):
-            code = 'C'
-        elif isinstance(action, CheckAction):
-            code = 'K'
-        else:
-            code = 'R' + str(action.amount)
-        self.socketfile.write(code + '\n')
+        self.socketfile.write(action_letters(action) + '\n')
         self.socketfile.flush()
     
     def run(self):
@@ -57,7 +63,7 @@ class Runner():
                     active = int(clause[1:])
                 elif clause[0] == 'H':
                     hands = [[], []]
-                    hands[active] = clause[1:].split(',')
+                    hands[active] = to_ints(clause[1:].split(','))
                     pips = [SMALL_BLIND, BIG_BLIND]
                     stacks = [STARTING_STACK - SMALL_BLIND, STARTING_STACK - BIG_BLIND]
                     round_state = RoundState(0, 0, pips, stacks, hands, [], None)
@@ -74,12 +80,12 @@ class Runner():
                     round_state = round_state.proceed(RaiseAction(int(clause[1:])))
                 elif clause[0] == 'B':
                     round_state = RoundState(round_state.button, round_state.street, round_state.pips, round_state.stacks,
-                                             round_state.hands, clause[1:].split(','), round_state.previous_state)
+                                             round_state.hands, to_ints(clause[1:].split(',')), round_state.previous_state)
                 elif clause[0] == 'O':
                     # backtrack
                     round_state = round_state.previous_state
                     revised_hands = list(round_state.hands)
-                    revised_hands[1-active] = clause[1:].split(',')
+                    revised_hands[1-active] = to_ints(clause[1:].split(','))
                     # rebuild history
                     round_state = RoundState(round_state.button, round_state.street, round_state.pips, round_state.stacks,
                                              revised_hands, round_state.deck, round_state.previous_state)
@@ -100,7 +106,8 @@ class Runner():
                 self.send(CheckAction())
             else:
                 assert active == round_state.button % 2
-                action = self.pokerbot.get_action(game_state, round_state, active)
+                deadline = time.monotonic() + action_budget(game_state)
+                action = self.pokerbot.get_action_by(game_state, round_state, active, deadline)
                 self.send(action)
 def parse_args():
     '''
@@ -4,6 +4,7 @@ Encapsulates the game and round state information for the player
 
 from collections import namedtuple
 from apps.poker.game_engine import FoldAction, CallAction, CheckAction, RaiseAction
+from apps.poker.game_engine import LEGAL_ACTION_SETS, legal_action_mask
 
 GameState = namedtuple('GameState', ['bankroll', 'game_clock', 'round_num'])
 TerminalState = namedtuple('TerminalState', ['deltas', 'previous_state'])
@@ -24,20 +25,18 @@ class RoundState(namedtuple('_RoundState', ['button', 'street', 'pips', 'stacks'
         '''
         return TerminalState([0, 0], self)
 
+    def legal_mask(self):
+        '''
+        Returns the active player's legal moves as a bitmask of action kinds.
+        We can only raise the stakes if both players can afford it.
+        '''
+        return legal_action_mask(self.button, self.pips, self.stacks)
+
     def legal_actions(self):
         '''
         Returns a set which corresponds to the active player's legal moves.
         '''
-        active = self.button % 2
-        continue_cost = self.pips[1-active] - self.pips[active]
-        if continue_cost == 0:
-            # we can only raise the stakes if both players can afford it
-            bets_forbidden = (self.stacks[0] == 0 or self.stacks[1] == 0)
-            return {CheckAction} if bets_forbidden else {CheckAction, RaiseAction}
-        # continue_cost > 0
-        # similarly, re-raising is only allowed if both players can afford it
-        raises_forbidden = (continue_cost == self.stacks[active] or self.stacks[1-active] == 0)
-        return {FoldAction, CallAction} if raises_forbidden else {FoldAction, CallAction, RaiseAction}
+        return LEGAL_ACTION_SETS[legal_action_mask(self.button, self.pips, self.stacks)]
     
     def raise_bounds(self):
         '''
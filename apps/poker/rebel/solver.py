@@ -0,0 +1,290 @@
+# poker/rebel/solver.py
+'''
+Linear CFR over a depth-limited public subgame, vectorized over 1326-combo ranges.
+
+The subgame is the rest of the current betting round. It is expanded from the
+real round state with the engine's own proceed(), over an abstraction of fold,
+check or call, and a few raise sizes, with at most MAX_RAISES raises. Where the
+street ends, or the hand ends without a fold, the subgame stops at a leaf and a
+value function scores it. Folds are scored exactly.
+
+Every decision node keeps its regrets and average strategy as
+(actions, NUM_COMBOS) arrays, one column per private hand. One iteration does
+three passes. A forward pass spreads both players' reach vectors down the tree.
+All leaves are then scored in one batched call. A backward pass collects
+counterfactual values and updates regrets. Iteration t is weighted by t, as in
+linear CFR, so no per-combo Python loop is ever run.
+
+A leaf value function has a values(reach0, reach1, contributions) method. Both
+reach arguments are (NUM_COMBOS, leaves) stacks. contributions is
+(leaves, 2): the chips each player has put in the pot. The method returns
+each player's counterfactual values in the same shape as the reach stacks.
+ShowdownValue is the default. It assumes the hand is checked down from the leaf.
+'''
+import time
+from functools import lru_cache
+import numpy as np
+
+from apps.poker.cards import NUM_CARDS, to_ints
+from apps.poker.combos import NUM_COMBOS, COMBOS, CARD_COMBOS, COMBO_CONFLICTS, blocker_mask, combo_index, compatible_mass
+from apps.poker.game_engine import FoldAction, CallAction, CheckAction, RaiseAction
+from apps.poker.game_engine import FOLD_BIT, CALL_BIT, CHECK_BIT, RAISE_BIT
+from apps.poker.hand_eval import evaluate_batch
+
+RAISE_FRACTIONS = (0.5, 1.0)  # bet sizes as fractions of the pot after calling, next to all-in
+MAX_RAISES = 2  # raises the subgame allows before only fold, check and call remain
+RUNOUT_SAMPLES = 16  # runouts behind a flop or turn equity matrix
+EQUITY_MATRIX_CACHE = 2  # boards whose equity matrices stay in memory, about 7MB each
+
+DECISION, FOLD, LEAF = range(3)
+
+@lru_cache(maxsize=EQUITY_MATRIX_CACHE)
+def equity_matrix(board, runouts=RUNOUT_SAMPLES):
+    '''
+    Returns E with E[i, j] the showdown equity of combo i against combo j on this board,
+    wins plus half of ties. Pairs that share a card, or a card with the board, are 0.
+
+    Arguments:
+    board: a sorted tuple of 3, 4 or 5 card ints. River boards are exact. Earlier boards
+           average RUNOUT_SAMPLES runouts, drawn from a generator seeded by the board so
+           repeated decisions on one street see the same matrix.
+    '''
+    board = np.asarray(board, dtype=np.intp)
+    missing = 5 - len(board)
+    if missing:
+        rng = np.random.default_rng(board.tolist())
+        live_cards = np.setdiff1d(np.arange(NUM_CARDS), board)
+        runouts = np.array([rng.choice(live_cards, missing, replace=False) for _ in range(runouts)])
+        boards = np.hstack([np.broadcast_to(board, (len(runouts), len(board))), runouts])
+    else:
+        boards = board[None, :]
+
+    # Every combo is scored on every runout in one evaluator call; combos that clash
+    # with a runout are masked out of its comparisons
+    masks = ~CARD_COMBOS[boards].any(axis=1)
+    hands = np.concatenate([np.hstack([COMBOS, np.broadcast_to(full_board, (NUM_COMBOS, 5))]) for full_board in boards])
+    values = evaluate_batch(hands.astype(np.uint8)).reshape(len(boards), NUM_COMBOS)
+    # score counts wins minus losses, so wins plus half of ties is (score + count) / 2
+    score = np.zeros((NUM_COMBOS, NUM_COMBOS), dtype=np.int16)
+    for value, mask in zip(values, masks):
+        outcome = np.greater.outer(value, value).view(np.int8) - np.less.outer(value, value).view(np.int8)
+        score += outcome * np.logical_and.outer(mask, mask)
+    weights = masks.astype(np.float32)
+    counts = (weights.T @ weights) * ~COMBO_CONFLICTS
+    equity = np.divide(score + counts, 2 * counts, out=np.zeros_like(counts), where=counts > 0)
+    equity.setflags(write=False)
+    return equity
+
+class ShowdownValue:
+    '''
+    Leaf values when the rest of the hand is checked down: each player's share of
+    the pot by showdown equity, less the chips they put in.
+    '''
+
+    def __init__(self, board, runouts=RUNOUT_SAMPLES):
+        self.equity = equity_matrix(tuple(sorted(board)), runouts)
+
+    def values(self, reach0, reach1, contributions):
+        pot = contributions.sum(axis=1)
+        leaves = reach0.shape[1]
+        # E[i, j] + E[j, i] is 1 for compatible pairs, so one product with E serves both players
+        shares = self.equity @ np.hstack([reach1, reach0])
+        value0 = pot * shares[:, :leaves] - contributions[:, 0] * compatible_mass(reach1)
+        value1 = pot * shares[:, leaves:] - contributions[:, 1] * compatible_mass(reach0)
+        return value0, value1
+
+class SubgameNode:
+    __slots__ = ('index', 'kind', 'state', 'player', 'actions', 'children', 'contributions',
+                 'regrets', 'strategy_sum', 'strategy')
+
+    def __init__(self, index, kind, state, contributions):
+        self.index = index
+        self.kind = kind
+        self.state = state
+        self.player = state.button % 2
+        self.contributions = contributions
+        self.actions = []
+        self.children = []
+
+def abstract_actions(state, contributions, allow_raise, raise_fractions=RAISE_FRACTIONS):
+    '''
+    Returns the subgame's actions at state: fold when facing a bet, check or call,
+    and pot-fraction raises plus all-in while raises remain.
+    '''
+    legal_mask = state.legal_mask()
+    actions = []
+    if legal_mask & FOLD_BIT:
+        actions.append(FoldAction())
+    if legal_mask & CHECK_BIT:
+        actions.append(CheckAction())
+    elif legal_mask & CALL_BIT:
+        actions.append(CallAction())
+    if allow_raise and legal_mask & RAISE_BIT:
+        active = state.button % 2
+        min_raise, max_raise = state.raise_bounds()
+        continue_cost = state.pips[1-active] - state.pips[active]
+        pot = sum(contributions) + continue_cost
+        amounts = {max_raise}
+        for fraction in raise_fractions:
+            amounts.add(min(max_raise, max(min_raise, state.pips[active] + continue_cost + int(fraction * pot))))
+        actions.extend(RaiseAction(amount) for amount in sorted(amounts))
+    return actions
+
+class SubgameSolver:
+    '''
+    Linear CFR on the subgame rooted at round_state.
+
+    Arguments:
+    round_state: the engine state to solve from, with the street's pips already posted.
+    ranges: (2, NUM_COMBOS) weights of each player's private hands at the root. Combos the
+            board blocks are dropped and each range is normalized, so values are in chips.
+    pot: chips in the middle from earlier streets, split evenly between the players.
+    leaf_value: the value function for leaves, ShowdownValue on the board by default.
+    t_warm: iterations left out of the average strategy, while regrets are still noise.
+    '''
+
+    def __init__(self, round_state, ranges, pot=0, leaf_value=None, t_warm=0,
+                 raise_fractions=RAISE_FRACTIONS, max_raises=MAX_RAISES):
+        board = to_ints(round_state.deck[:round_state.street])
+        ranges = np.asarray(ranges, dtype=np.float32) * blocker_mask(board)
+        self.ranges = ranges / np.maximum(ranges.sum(axis=1, keepdims=True), np.finfo(np.float32).tiny)
+        self.leaf_value = leaf_value if leaf_value is not None else ShowdownValue(board)
+        self.t_warm = t_warm
+        self.raise_fractions = raise_fractions
+        self.max_raises = max_raises
+        self.iterations = 0
+        self.nodes = []
+        self._root_stacks = list(round_state.stacks)
+        self._root_pips = list(round_state.pips)
+        self._base = pot / 2
+        self.root = self._expand(round_state, 0)
+        self.decisions = [node for node in self.nodes if node.kind == DECISION]
+        self.folds = [node for node in self.nodes if node.kind == FOLD]
+        self.leaves = [node for node in self.nodes if node.kind == LEAF]
+        self._leaf_contributions = np.array([node.contributions for node in self.leaves], dtype=np.float32).reshape(-1, 2)
+
+    def _contributions(self, state):
+        return tuple(self._base + self._root_pips[i] + self._root_stacks[i] - state.stacks[i] for i in range(2))
+
+    def _add_node(self, kind, state, contributions):
+        node = SubgameNode(len(self.nodes), kind, state, contributions)
+        self.nodes.append(node)
+        return node
+
+    def _expand(self, state, raises):
+        contributions = self._contributions(state)
+        node = self._add_node(DECISION, state, contributions)
+        actions = abstract_actions(state, contributions, raises < self.max_raises, self.raise_fractions)
+        for action in actions:
+            if isinstance(action, FoldAction):
+                child = self._add_node(FOLD, state, contributions)
+            else:
+                next_state = state.proceed(action)
+                if hasattr(next_state, 'deltas'):
+                    # Showdown: the engine already settled, the stacks before payoff are what counts
+                    child = self._add_node(LEAF, next_state.previous_state, self._contributions(next_state.previous_state))
+                elif next_state.street != state.street:
+                    child = self._add_node(LEAF, next_state, self._contributions(next_state))
+                else:
+                    child = self._expand(next_state, raises + isinstance(action, RaiseAction))
+            node.actions.append(action)
+            node.children.append(child)
+        node.regrets = np.zeros((len(actions), NUM_COMBOS), dtype=np.float32)
+        node.strategy_sum = np.zeros((len(actions), NUM_COMBOS), dtype=np.float32)
+        return node
+
+    def _regret_matching(self, node):
+        positive = np.maximum(node.regrets, 0)
+        total = positive.sum(axis=0)
+        uniform = np.float32(1 / len(node.actions))
+        return np.where(total > 0, positive / np.where(total > 0, total, 1), uniform)
+
+    def iterate(self):
+        '''
+        Runs one linear CFR iteration over the whole subgame and returns the root's
+        counterfactual values under the current strategies, shape (2, NUM_COMBOS).
+        '''
+        t = self.iterations + 1
+        reach = [None] * len(self.nodes)
+        values = [None] * len(self.nodes)
+        reach[0] = self.ranges
+
+        # Forward: current strategies and reach probabilities, parents before children
+        for node in self.decisions:
+            node.strategy = self._regret_matching(node)
+            node_reach = reach[node.index]
+            for action_index, child in enumerate(node.children):
+                child_reach = node_reach.copy()
+                child_reach[node.player] *= node.strategy[action_index]
+                reach[child.index] = child_reach
+
+        # Leaves, all scored in one batch
+        if self.leaves:
+            reaches = np.stack([reach[node.index] for node in self.leaves], axis=2)
+            value0, value1 = self.leaf_value.values(reaches[0], reaches[1], self._leaf_contributions)
+            for column, node in enumerate(self.leaves):
+                values[node.index] = np.stack([value0[:, column], value1[:, column]])
+        if self.folds:
+            reaches = np.stack([reach[node.index] for node in self.folds], axis=2)
+            masses = (compatible_mass(reaches[1]), compatible_mass(reaches[0]))
+            for column, node in enumerate(self.folds):
+                folder = node.player
+                node_values = np.empty((2, NUM_COMBOS), dtype=np.float32)
+                node_values[folder] = -node.contributions[folder] * masses[folder][:, column]
+                node_values[1-folder] = node.contributions[folder] * masses[1-folder][:, column]
+                values[node.index] = node_values
+
+        # Backward: counterfactual values, linearly weighted regrets and average strategy
+        for node in reversed(self.decisions):
+            player = node.player
+            child_values = np.stack([values[child.index] for child in node.children])
+            node_values = np.empty((2, NUM_COMBOS), dtype=np.float32)
+            node_values[player] = (node.strategy * child_values[:, player]).sum(axis=0)
+            node_values[1-player] = child_values[:, 1-player].sum(axis=0)
+            values[node.index] = node_values
+            node.regrets += t * (child_values[:, player] - node_values[player])
+            if t > self.t_warm:
+                node.strategy_sum += (t - self.t_warm) * reach[node.index][player] * node.strategy
+        self.iterations = t
+        return values[0]
+
+    def solve(self, iterations, deadline=None):
+        '''
+        Runs up to iterations more iterations, stopping early once the time.monotonic()
+        deadline passes. Returns the number of iterations run.
+        '''
+        for done in range(iterations):
+            if deadline is not None and time.monotonic() >= deadline:
+                return done
+            self.iterate()
+        return iterations
+
+    def average_strategy(self, node=None):
+        '''
+        Returns the (actions, NUM_COMBOS) average strategy of a decision node, the root by default.
+        Before any iteration is averaged (see t_warm), hands play the current regret-matching strategy.
+        '''
+        node = node or self.root
+        total = node.strategy_sum.sum(axis=0)
+        current = self._regret_matching(node)
+        return np.where(total > 0, node.strategy_sum / np.where(total > 0, total, 1), current)
+
+    def match_action(self, node, action):
+        '''
+        Returns the index of the node's abstract action closest to an observed action: the
+        same kind, and for raises the nearest amount. None if the abstraction has no such kind.
+        '''
+        candidates = [index for index, candidate in enumerate(node.actions) if type(candidate) is type(action)]
+        if not candidates:
+            return None
+        if isinstance(action, RaiseAction):
+            return min(candidates, key=lambda index: abs(node.actions[index].amount - action.amount))
+        return candidates[0]
+
+    def root_policy(self, hole):
+        '''
+        Returns [(action, probability)] at the root for the given hole cards.
+        '''
+        column = combo_index(to_ints(hole))
+        strategy = self.average_strategy()[:, column]
+        return list(zip(self.root.actions, strategy.tolist()))
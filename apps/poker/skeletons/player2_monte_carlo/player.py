@@ -11,6 +11,11 @@ import eval7
 import random
 
 
+MONTE_CARLO_ITERS = 100  # samples behind get_action's decision
+MONTE_CARLO_BATCH = 50  # samples added per anytime refine() step
+MAX_MONTE_CARLO_ITERS = 20000  # refine() stops here even if the clock allows more
+
+
 class Player(Bot):
     '''
     A pokerbot.
@@ -125,6 +130,17 @@ class Player(Bot):
         Returns:
         Your action.
         '''
+        self.begin_action(game_state, round_state, active)
+        while self.iterations < MONTE_CARLO_ITERS:
+            self.refine()
+        return self.best_action()
+
+
+    def begin_action(self, game_state, round_state, active):
+        '''
+        Starts an anytime decision: the engine calls refine() while our share of
+        game_clock lasts, then best_action().
+        '''
         legal_actions = round_state.legal_actions()  # the actions you are allowed to take
         street = round_state.street  # int representing pre-flop, flop, turn, or river respectively
         my_cards = round_state.hands[active]  # your cards
@@ -168,10 +184,36 @@ class Player(Bot):
         else:
             temp_action = FoldAction()
 
+        self.my_cards = my_cards
+        self.temp_action = temp_action
+        self.continue_cost = continue_cost
+        self.pot_total = pot_total
+        self.strength = 0
+        self.iterations = 0
+        self.refine()
+        return True
 
-        MONTE_CARLO_ITERS = 100
-        strength = self.calc_strength(my_cards, MONTE_CARLO_ITERS)
 
+    def refine(self):
+        '''
+        Adds a batch of Monte Carlo samples to the running strength estimate.
+        '''
+        if self.iterations >= MAX_MONTE_CARLO_ITERS:
+            return False
+        batch_strength = self.calc_strength(self.my_cards, MONTE_CARLO_BATCH)
+        self.strength = (self.strength * self.iterations + batch_strength * MONTE_CARLO_BATCH) / (self.iterations + MONTE_CARLO_BATCH)
+        self.iterations += MONTE_CARLO_BATCH
+        return self.iterations < MAX_MONTE_CARLO_ITERS
+
+
+    def best_action(self):
+        '''
+        Picks an action from the strength estimated so far.
+        '''
+        strength = self.strength
+        temp_action = self.temp_action
+        continue_cost = self.continue_cost
+        pot_total = self.pot_total
 
         if continue_cost > 0:
             scary = 0
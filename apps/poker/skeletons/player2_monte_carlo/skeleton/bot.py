@@ -1,6 +1,7 @@
 '''
 This file contains the base class that you should implement for your pokerbot.
 '''
+import time
 
 
 class Bot():
@@ -49,4 +50,50 @@ class Bot():
         Returns:
         Your action.
         '''
-        raise NotImplementedError('get_action')
\ No newline at end of file
+        raise NotImplementedError('get_action')
+
+    def begin_action(self, game_state, round_state, active):
+        '''
+        Optional anytime interface: starts a decision that refine() improves and
+        best_action() reads. Called by get_action_by instead of get_action.
+
+        Arguments:
+        game_state: the GameState object.
+        round_state: the RoundState object.
+        active: your player's index.
+
+        Returns:
+        True if your bot implements the anytime interface. The default returns
+        False, and the engine calls get_action instead.
+        '''
+        return False
+
+    def refine(self):
+        '''
+        Does one small increment of work on the current decision, e.g. a batch of
+        Monte Carlo samples. Keep increments short: the deadline is only checked
+        between them.
+
+        Returns:
+        False once further increments would not change the decision.
+        '''
+        return False
+
+    def best_action(self):
+        '''
+        Returns the best action found so far for the current decision.
+        '''
+        raise NotImplementedError('best_action')
+
+    def get_action_by(self, game_state, round_state, active, deadline, cancelled=None):
+        '''
+        Called by the engine in place of get_action. deadline is a time.monotonic()
+        value: an anytime bot is refined until it passes, or until refine() has
+        nothing left to do, and its best action so far is returned. cancelled is an
+        optional threading.Event that stops the refinement early once set.
+        '''
+        if not self.begin_action(game_state, round_state, active):
+            return self.get_action(game_state, round_state, active)
+        while time.monotonic() < deadline and not (cancelled is not None and cancelled.is_set()) and self.refine():
+            pass
+        return self.best_action()
@@ -3,12 +3,25 @@ The infrastructure for interacting with the engine.
 '''
 import argparse
 import socket
+import time
 from .actions import FoldAction, CallAction, CheckAction, RaiseAction
 from .states import GameState, TerminalState, RoundState
-from .states import STARTING_STACK, BIG_BLIND, SMALL_BLIND
+from .states import NUM_ROUNDS, STARTING_STACK, BIG_BLIND, SMALL_BLIND
 from .bot import Bot
 
 
+ACTIONS_PER_ROUND = 4  # expected decisions per round when spreading the game clock
+CLOCK_SHARE = 0.5  # fraction of an action's share of the clock the bot may spend, the rest is slack
+
+
+def action_budget(game_state):
+    '''
+    Seconds the bot may think about one action, from the game clock it has left.
+    '''
+    actions_left = max(1, NUM_ROUNDS - game_state.round_num + 1) * ACTIONS_PER_ROUND
+    return CLOCK_SHARE * max(0., game_state.game_clock) / actions_left
+
+
 class Runner():
     '''
     Interacts with the engine.
@@ -102,7 +115,8 @@ class Runner():
                 self.send(CheckAction())
             else:
                 assert active == round_state.button % 2
-                action = self.pokerbot.get_action(game_state, round_state, active)
+                deadline = time.monotonic() + action_budget(game_state)
+                action = self.pokerbot.get_action_by(game_state, round_state, active, deadline)
                 self.send(action)
 
 
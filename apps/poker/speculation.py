@@ -0,0 +1,133 @@
+# poker/speculation.py
+'''
+Precomputes the bot's reply to the human's likely actions while they think.
+
+When a response hands the turn to the human, speculate() queues a job that
+plays each likely human action on a copy of the state (check or call first,
+then fold and a few bucketed raise sizes) and stores the bot's reply, with
+the copy of the bot that chose it, under the resulting state's hash. The hash mixes the public Zobrist hash with the
+bot's hole cards (RoundState.private_hash), so it identifies exactly what
+the bot decides on. take() consumes a session's branches when the real
+action arrives: a hit answers instantly and every other branch is dropped.
+The caller installs the hit's bot as its live bot, so whatever the decision
+left on the bot (its belief state, the solver node it acted from, cached
+strength samples) is kept exactly as if it had decided during the request.
+
+Jobs run on SPECULATION_WORKERS threads, each bounded by SPECULATION_BUDGET
+seconds of thread CPU time. Each branch decides on its own copy of the bot,
+so branches never share per-decision state or random generators with each
+other or with a request.
+'''
+import copy
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .config import PokerSettings
+from .game_engine import CallAction, CheckAction, FoldAction, RaiseAction, TerminalState
+from .game_engine import CALL_BIT, CHECK_BIT, FOLD_BIT, RAISE_BIT
+
+BOT = 1
+
+def likely_actions(round_state):
+    '''
+    Returns the human's legal actions at round_state, most likely first, with raises
+    bucketed to the minimum, roughly pot-sized and all-in amounts.
+    '''
+    legal_mask = round_state.legal_mask()
+    actions = []
+    if legal_mask & CHECK_BIT:
+        actions.append(CheckAction())
+    if legal_mask & CALL_BIT:
+        actions.append(CallAction())
+    if legal_mask & RAISE_BIT:
+        min_raise, max_raise = round_state.raise_bounds()
+        pot = 2 * PokerSettings.STARTING_STACK - sum(round_state.stacks)
+        for amount in (min_raise, max(round_state.pips) + pot, max_raise):
+            amount = max(min_raise, min(max_raise, amount))
+            if all(amount != action.amount for action in actions if isinstance(action, RaiseAction)):
+                actions.append(RaiseAction(amount))
+    if legal_mask & FOLD_BIT:
+        actions.append(FoldAction())
+    return actions
+
+class BotSpeculator:
+    def __init__(self, workers=PokerSettings.SPECULATION_WORKERS, budget=PokerSettings.SPECULATION_BUDGET,
+                 maxsize=PokerSettings.SPECULATION_SESSIONS):
+        self.budget = budget
+        self.maxsize = maxsize
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bot-speculation')
+        self._branches = OrderedDict()  # session_id -> {state hash: (bot action, bot that chose it)}
+        self._generations = {}  # session_id -> id of the session's current job
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def speculate(self, session_id, round_state, bot):
+        '''
+        Queues the bot's replies to the human's likely actions at round_state,
+        replacing whatever was speculated for this session before. Returns the job's Future.
+        '''
+        session_id = str(session_id)
+        with self._lock:
+            generation = self._generations.get(session_id, 0) + 1
+            self._generations[session_id] = generation
+            self._branches[session_id] = {}
+            self._branches.move_to_end(session_id)
+            while len(self._branches) > self.maxsize:
+                evicted, _ = self._branches.popitem(last=False)
+                self._generations.pop(evicted, None)
+        # Taken now, while the request that owns the live bot is still running
+        bot = copy.copy(bot)
+        return self._executor.submit(self._run, session_id, generation, round_state, bot)
+
+    def _current(self, session_id, generation):
+        return self._generations.get(session_id) == generation
+
+    def _run(self, session_id, generation, round_state, bot):
+        deadline = time.thread_time() + self.budget
+        try:
+            for action in likely_actions(round_state):
+                if time.thread_time() >= deadline or not self._current(session_id, generation):
+                    break
+                next_state = round_state.proceed(action)
+                if isinstance(next_state, TerminalState):
+                    continue
+                # Decisions replace the bot's per-decision attributes rather than mutating them, so a shallow copy suffices
+                branch_bot = copy.copy(bot)
+                branch_bot.rng = np.random.default_rng()
+                reply = branch_bot.get_action_by(None, next_state, BOT, time.monotonic() + PokerSettings.BOT_ACTION_BUDGET)
+                with self._lock:
+                    if not self._current(session_id, generation):
+                        break
+                    self._branches[session_id][next_state.private_hash(BOT)] = (reply, branch_bot)
+        except Exception as e:
+            print(f"[DEBUG] Bot speculation failed: {str(e)}")
+
+    def take(self, session_id, round_state):
+        '''
+        Returns the speculated (bot action, bot that chose it) for round_state, or None.
+        Either way the session's other branches are dropped and any job still running for it stops.
+        '''
+        session_id = str(session_id)
+        key = round_state.private_hash(BOT)
+        with self._lock:
+            branches = self._branches.pop(session_id, None)
+            if session_id in self._generations:
+                self._generations[session_id] += 1
+            branch = branches.get(key) if branches else None
+            if branch is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return branch
+
+    def discard(self, session_id):
+        with self._lock:
+            self._branches.pop(str(session_id), None)
+            self._generations.pop(str(session_id), None)
+
+bot_speculator = BotSpeculator()
@@ -0,0 +1,168 @@
+# poker/state_codec.py
+'''
+Versioned binary encoding of the serialized round state stored on GameSession,
+and the compact card and action encodings of HandRecord.
+
+encode_game_state takes the dict built by PokerGameManager._serialize_game_state
+and packs it into a few dozen bytes; decode_game_state returns the same dict.
+Every blob starts with a version byte and a flags byte. The fixed fields of
+each version are listed in its schema below, followed by the flagged optional
+fields in schema order and then the variable-length card and hand type lists.
+From version 2, live states end with the hand's (actor, action code) list in
+the encode_hand_actions format, behind a uint16 count; from version 3 only
+when ACTIONS_FLAG is set, so a state without an action list decodes without
+one rather than with an empty list.
+New versions get a new schema entry; old blobs keep decoding with theirs.
+'''
+import struct
+
+from .cards import to_ints, to_strs
+
+CODEC_VERSION = 3
+
+HAND_TYPES = ('High Card', 'Pair', 'Two Pair', 'Trips', 'Straight', 'Flush', 'Full House', 'Quads', 'Straight Flush')
+_HAND_TYPE_INDEX = {name: index for index, name in enumerate(HAND_TYPES)}
+
+_HEADER = struct.Struct('<BB')
+_COUNT = struct.Struct('<H')
+TERMINAL_FLAG = 1
+ACTIONS_FLAG = 64
+
+# Per version: fixed fields for live and terminal states, as (key, struct format),
+# optional fields as (flag, key, struct format), and when live states carry their actions:
+# never (None), always (0) or when their flag is set
+SCHEMAS = {
+    1: {
+        'round': (('button', 'H'), ('street', 'B'), ('final_street', 'B'),
+                  ('pips', '2h'), ('stacks', '2h'), ('total_pot', 'i')),
+        'terminal': (('button', 'H'), ('total_pot', 'i')),
+        'optional': ((2, 'outcome', 'b'), (4, 'zobrist', 'Q'), (8, 'deck_seed', 'Q'), (16, 'deltas', '2h')),
+        'actions': None,
+    },
+    2: {
+        'round': (('button', 'H'), ('street', 'B'), ('final_street', 'B'),
+                  ('pips', '2h'), ('stacks', '2h'), ('total_pot', 'i')),
+        'terminal': (('button', 'H'), ('total_pot', 'i')),
+        'optional': ((2, 'outcome', 'b'), (4, 'zobrist', 'Q'), (8, 'deck_seed', 'Q'), (16, 'deltas', '2h'),
+                     (32, 'start_stacks', '2h')),
+        'actions': 0,
+    },
+    3: {
+        'round': (('button', 'H'), ('street', 'B'), ('final_street', 'B'),
+                  ('pips', '2h'), ('stacks', '2h'), ('total_pot', 'i')),
+        'terminal': (('button', 'H'), ('total_pot', 'i')),
+        'optional': ((2, 'outcome', 'b'), (4, 'zobrist', 'Q'), (8, 'deck_seed', 'Q'), (16, 'deltas', '2h'),
+                     (32, 'start_stacks', '2h')),
+        'actions': ACTIONS_FLAG,
+    },
+}
+
+def _has_actions(schema, terminal, flags):
+    return not terminal and schema['actions'] is not None and (schema['actions'] == 0 or bool(flags & schema['actions']))
+
+def _struct(fields):
+    return struct.Struct('<' + ''.join(fmt for _, fmt in fields))
+
+def _flatten(values, fields):
+    flat = []
+    for (_, fmt), value in zip(fields, values):
+        if fmt[0].isdigit():
+            flat.extend(value)
+        else:
+            flat.append(value)
+    return flat
+
+def _unflatten(flat, fields, state):
+    position = 0
+    for key, fmt in fields:
+        if fmt[0].isdigit():
+            count = int(fmt[:-1])
+            state[key] = list(flat[position:position + count])
+            position += count
+        else:
+            state[key] = flat[position]
+            position += 1
+
+def encode_game_state(state):
+    '''
+    Packs a serialized round state dict into bytes with the current schema.
+    '''
+    schema = SCHEMAS[CODEC_VERSION]
+    terminal = bool(state.get('terminal', False))
+    fields = schema['terminal'] if terminal else schema['round']
+    flags = TERMINAL_FLAG if terminal else 0
+
+    optional = []
+    for flag, key, fmt in schema['optional']:
+        if state.get(key) is not None:
+            flags |= flag
+            optional.append((key, fmt))
+    if not terminal and state.get('actions') is not None:
+        flags |= schema['actions']
+
+    values = [state.get(key, 0) for key, _ in fields] + [state[key] for key, _ in optional]
+    parts = [
+        _HEADER.pack(CODEC_VERSION, flags),
+        _struct(fields + tuple(optional)).pack(*_flatten(values, fields + tuple(optional))),
+    ]
+    # Unseeded live hands carry their cards: two hole cards per player, then the deck
+    if not terminal and state.get('deck_seed') is None:
+        hands = [card for hand in state['hands'] for card in to_ints(hand)]
+        deck = to_ints(state['deck'])
+        parts.append(bytes([len(hands)] + hands + [len(deck)] + deck))
+    hand_types = [_HAND_TYPE_INDEX[name] for name in state.get('hand_types', [])]
+    parts.append(bytes([len(hand_types)] + hand_types))
+    if _has_actions(schema, terminal, flags):
+        actions = state['actions']
+        parts.append(_COUNT.pack(len(actions)) + encode_hand_actions(actions))
+    return b''.join(parts)
+
+def decode_game_state(data):
+    '''
+    Unpacks bytes from encode_game_state (any known version) into a state dict.
+    '''
+    data = bytes(data)
+    version, flags = _HEADER.unpack_from(data)
+    if version not in SCHEMAS:
+        raise ValueError(f"Unknown game state codec version: {version}")
+    schema = SCHEMAS[version]
+    terminal = bool(flags & TERMINAL_FLAG)
+    fields = schema['terminal'] if terminal else schema['round']
+    fields += tuple((key, fmt) for flag, key, fmt in schema['optional'] if flags & flag)
+
+    layout = _struct(fields)
+    state = {'terminal': terminal}
+    _unflatten(layout.unpack_from(data, _HEADER.size), fields, state)
+    if terminal and 'deltas' not in state:
+        state['deltas'] = None
+    position = _HEADER.size + layout.size
+
+    if not terminal and 'deck_seed' not in state:
+        count = data[position]
+        hands = list(data[position + 1:position + 1 + count])
+        position += 1 + count
+        count = data[position]
+        state['hands'] = [to_strs(hands[i:i + 2]) for i in range(0, len(hands), 2)]
+        state['deck'] = to_strs(data[position + 1:position + 1 + count])
+        position += 1 + count
+    count = data[position]
+    state['hand_types'] = [HAND_TYPES[index] for index in data[position + 1:position + 1 + count]]
+    position += 1 + count
+    if _has_actions(schema, terminal, flags):
+        count, = _COUNT.unpack_from(data, position)
+        position += _COUNT.size
+        state['actions'] = decode_hand_actions(data[position:position + 2 * count])
+    return state
+
+def encode_hand_actions(actions):
+    '''
+    Packs (actor, action code) pairs into little-endian int16s of code << 1 | actor.
+    '''
+    return struct.pack(f'<{len(actions)}h', *[(code << 1) | actor for actor, code in actions])
+
+def decode_hand_actions(data):
+    '''
+    Unpacks bytes from encode_hand_actions into (actor, action code) pairs.
+    '''
+    data = bytes(data)
+    return [(value & 1, value >> 1) for value in struct.unpack(f'<{len(data) // 2}h', data)]
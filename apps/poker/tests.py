@@ -0,0 +1,550 @@
+# poker/tests.py
+import importlib
+import itertools
+import random
+import time
+from unittest import mock
+
+import numpy as np
+from django.apps import apps
+from django.test import SimpleTestCase, TestCase
+
+from apps.users.models import CustomUser
+from . import hand_eval
+from .bot_moves import BotMoveRunner
+from .cards import evaluate
+from .equity import exact_equity
+from .isomorphism import canonical_hand, hand_index, index_size
+from .game_engine import RoundState, CompactRoundState, SearchState, TerminalState, VecRoundState, CallAction, CheckAction, FoldAction, RaiseAction
+from .game_engine import ACTION_CODES, RAISE_CODE
+from .game_manager import PokerGameManager, StaleSessionError
+from .hand_records import HandRecordWriter
+from .models import GameSession, HandRecord
+from .rebel.player import ReBeL
+from .speculation import BotSpeculator
+from .state_codec import decode_game_state, encode_game_state
+
+def deal(seed):
+    '''
+    Returns a random first preflop state, with either seat on the button.
+    '''
+    rng = random.Random(seed)
+    deck = list(range(52))
+    rng.shuffle(deck)
+    button = rng.randint(0, 1)
+    pips = [1, 2] if button == 0 else [2, 1]
+    stacks = [199, 198] if button == 0 else [198, 199]
+    return rng, RoundState(button, 0, 5, pips, stacks, [deck[:2], deck[2:4]], deck[4:], None)
+
+def random_action(rng, round_state):
+    '''
+    Returns a uniformly chosen legal action, with a uniform raise amount for raises.
+    '''
+    action_type = rng.choice(sorted(round_state.legal_actions(), key=lambda action_type: action_type.__name__))
+    if action_type is RaiseAction:
+        return RaiseAction(rng.randint(*round_state.raise_bounds()))
+    return action_type()
+
+def random_hands(seed, count, size):
+    '''
+    Returns count random hands of size distinct cards, half of them dealt from two suits
+    so flushes, straight flushes and full houses are common.
+    '''
+    rng = np.random.default_rng(seed)
+    hands = np.argsort(rng.random((count, 52)), axis=1)[:, :size]
+    two_suits = np.array([card for card in range(52) if card % 4 < 2])
+    hands[count // 2:] = two_suits[np.argsort(rng.random((count - count // 2, 26)), axis=1)[:, :size]]
+    return hands
+
+class HandEvalTests(SimpleTestCase):
+    HANDS = 20000
+
+    def assertMatchesEval7(self, hands, values):
+        expected = np.array([evaluate(hand.tolist()) for hand in hands])
+        mismatches = np.nonzero(values != expected)[0]
+        self.assertEqual(len(mismatches), 0, f"first mismatch: {hands[mismatches[:1]].tolist()}")
+
+    def test_masks_match_eval7(self):
+        '''
+        The rank-mask evaluator gives eval7's value for random 5, 6 and 7-card hands.
+        '''
+        for size in (5, 6, 7):
+            with self.subTest(size=size):
+                hands = random_hands(size, self.HANDS, size)
+                self.assertMatchesEval7(hands, hand_eval._evaluate_masks(hands.T.astype(np.intp, order='C')))
+
+    def test_rank_table_matches_eval7(self):
+        '''
+        evaluate_batch on 7 cards goes through a freshly built rank table and gives eval7's value;
+        a table already built on disk equals the fresh one.
+        '''
+        table = hand_eval.build_rank_table()
+        if hand_eval.RANK_TABLE is not None:
+            np.testing.assert_array_equal(hand_eval.RANK_TABLE, table)
+        hands = random_hands(0, self.HANDS, 7)
+        with mock.patch.object(hand_eval, 'RANK_TABLE', table), \
+                mock.patch.object(hand_eval, '_evaluate_masks', side_effect=AssertionError('mask path used')):
+            values = hand_eval.evaluate_batch(hands)
+        self.assertMatchesEval7(hands, values)
+
+class ExactEquityTests(SimpleTestCase):
+    def brute_force(self, hole, board):
+        dead = set(hole) | set(board)
+        live = [card for card in range(52) if card not in dead]
+        points = total = 0
+        for runout in itertools.combinations(live, 5 - len(board)):
+            full_board = list(board) + list(runout)
+            ours = evaluate(list(hole) + full_board)
+            for opponent in itertools.combinations([card for card in live if card not in runout], 2):
+                theirs = evaluate(list(opponent) + full_board)
+                points += 2 * (ours > theirs) + (ours == theirs)
+                total += 2
+        return points / total
+
+    def test_matches_brute_force(self):
+        '''
+        exact_equity equals a plain enumeration with eval7 on random river and turn boards.
+        '''
+        rng = random.Random(0)
+        for board_size in (5, 5, 5, 4):
+            cards = rng.sample(range(52), 2 + board_size)
+            hole, board = cards[:2], cards[2:]
+            with self.subTest(hole=hole, board=board):
+                self.assertAlmostEqual(exact_equity(hole, board), self.brute_force(hole, board), places=12)
+
+class IsomorphismTests(SimpleTestCase):
+    SITUATIONS = 300
+
+    def test_suit_permutations_share_index(self):
+        '''
+        Relabeling suits and reordering cards within a street never changes the canonical form or index,
+        while distinct canonical forms keep distinct indexes within index_size.
+        '''
+        rng = random.Random(0)
+        indexes = {}
+        for _ in range(self.SITUATIONS):
+            board_size = rng.choice((0, 3, 4, 5))
+            cards = rng.sample(range(52), 2 + board_size)
+            hole, board = cards[:2], cards[2:]
+            canonical, index = canonical_hand(hole, board), hand_index(hole, board)
+            self.assertLess(index, index_size(board_size))
+            self.assertEqual(indexes.setdefault((board_size, index), canonical), canonical)
+            for suits in itertools.permutations(range(4)):
+                relabel = lambda group: [(card & ~3) | suits[card & 3] for card in group]
+                flop = relabel(board[:3])
+                rng.shuffle(flop)
+                permuted_hole, permuted_board = relabel(hole)[::-1], flop + relabel(board[3:])
+                with self.subTest(hole=hole, board=board, suits=suits):
+                    self.assertEqual(canonical_hand(permuted_hole, permuted_board), canonical)
+                    self.assertEqual(hand_index(permuted_hole, permuted_board), index)
+
+class SearchStateTests(SimpleTestCase):
+    WALKS = 500
+
+    def test_apply_undo_matches_proceed(self):
+        '''
+        A random walk of applies and undos stays equal to the RoundState path it mirrors.
+        '''
+        for seed in range(self.WALKS):
+            rng, root = deal(seed)
+            search_state = SearchState.from_state(root)
+            path = [root]
+            for _ in range(60):
+                current = path[-1]
+                if isinstance(current, TerminalState) or (len(path) > 1 and rng.random() < 0.3):
+                    if len(path) == 1:
+                        break
+                    search_state.undo()
+                    path.pop()
+                else:
+                    action = random_action(rng, current)
+                    search_state.apply(action)
+                    path.append(current.proceed(action))
+                current = path[-1]
+                with self.subTest(seed=seed, depth=len(path) - 1):
+                    if isinstance(current, TerminalState):
+                        self.assertTrue(search_state.terminal)
+                        self.assertEqual(search_state.deltas, current.deltas)
+                    else:
+                        self.assertFalse(search_state.terminal)
+                        self.assertEqual((search_state.button, search_state.street, search_state.pips, search_state.stacks),
+                                         (current.button, current.street, current.pips, current.stacks))
+                        self.assertEqual(search_state.legal_actions(), current.legal_actions())
+                        self.assertEqual(search_state.raise_bounds(), current.raise_bounds())
+                        self.assertEqual(search_state.zobrist, current.zobrist)
+
+class VecRoundStateTests(SimpleTestCase):
+    BATCH = 500
+
+    def test_rows_match_round_state(self):
+        '''
+        Stepping a batch with a random legal action per row keeps every row equal to RoundState.proceed
+        on that row's hand, down to the terminal deltas.
+        '''
+        rng = random.Random(0)
+        vec = VecRoundState.deal(self.BATCH, 0)
+        scalar = [vec.row(index) for index in range(self.BATCH)]
+        while not vec.done.all():
+            kinds = np.zeros(self.BATCH, dtype=np.int32)
+            amounts = np.zeros(self.BATCH, dtype=np.int32)
+            for index, state in enumerate(scalar):
+                if isinstance(state, TerminalState):
+                    continue
+                action = random_action(rng, state)
+                kinds[index] = ACTION_CODES[type(action)]
+                if kinds[index] == RAISE_CODE:
+                    amounts[index] = action.amount
+                scalar[index] = state.proceed(action)
+            vec = vec.proceed(kinds, amounts)
+            min_raise, max_raise = vec.raise_bounds()
+            legal_mask = vec.legal_mask()
+            for index, state in enumerate(scalar):
+                with self.subTest(row=index):
+                    self.assertEqual(bool(vec.done[index]), isinstance(state, TerminalState))
+                    if isinstance(state, TerminalState):
+                        self.assertEqual(vec.deltas[index].tolist(), state.deltas)
+                        continue
+                    self.assertEqual((int(vec.button[index]), int(vec.street[index]), vec.pips[index].tolist(), vec.stacks[index].tolist()),
+                                     (state.button, state.street, list(state.pips), list(state.stacks)))
+                    self.assertEqual(legal_mask[index], state.legal_mask())
+                    if legal_mask[index] & (1 << RAISE_CODE):
+                        self.assertEqual((min_raise[index], max_raise[index]), tuple(state.raise_bounds()))
+
+class ZobristTests(SimpleTestCase):
+    HANDS = 500
+
+    def test_state_classes_hash_alike(self):
+        '''
+        RoundState, CompactRoundState and SearchState keep equal hashes along a played hand,
+        and undoing every action restores the root hash.
+        '''
+        for seed in range(self.HANDS):
+            rng, round_state = deal(seed)
+            root_hash = round_state.zobrist
+            compact = CompactRoundState(round_state.button, 0, 5, round_state.pips, round_state.stacks,
+                                        round_state.hands, round_state.deck)
+            search_state = SearchState.from_state(round_state)
+            with self.subTest(seed=seed):
+                self.assertEqual(compact.zobrist, root_hash)
+                self.assertEqual(search_state.zobrist, root_hash)
+                while True:
+                    action = random_action(rng, round_state)
+                    next_state = round_state.proceed(action)
+                    next_compact = compact.proceed(action)
+                    search_state.apply(action)
+                    if isinstance(next_state, TerminalState):
+                        break
+                    self.assertEqual(next_compact.zobrist, next_state.zobrist)
+                    self.assertEqual(search_state.zobrist, next_state.zobrist)
+                    self.assertEqual(next_compact.previous_state.zobrist, compact.zobrist)
+                    round_state, compact = next_state, next_compact
+                while search_state.depth:
+                    search_state.undo()
+                self.assertEqual(search_state.zobrist, root_hash)
+
+class FlushTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='player', email='player@example.com', coins=1000)
+        self.session = GameSession.objects.create(player=self.user, current_street='preflop')
+
+    def test_stale_manager_cannot_overwrite(self):
+        '''
+        Of two managers loaded from the same row, the second to flush writes nothing.
+        '''
+        first = PokerGameManager(GameSession.objects.get(pk=self.session.pk))
+        second = PokerGameManager(GameSession.objects.get(pk=self.session.pk))
+        first.session.pot = 10
+        first.flush()
+        second.session.pot = 20
+        with self.assertRaises(StaleSessionError):
+            second.flush()
+        row = GameSession.objects.get(pk=self.session.pk)
+        self.assertEqual((row.pot, row.version), (10, 1))
+
+class HandRecordTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='player', email='player@example.com', coins=1000)
+        self.manager = PokerGameManager(GameSession.objects.create(player=self.user, current_street='preflop'))
+        self.manager.hand_start_stacks = [150, 250]
+        self.manager.hand_actions = [(0, 0)]
+        _, round_state = deal(0)
+        self.terminal_state = round_state.proceed(FoldAction())
+
+    def test_delta_measured_from_session_stack(self):
+        '''
+        The player's delta is the change in their session stack, not in the engine's fixed starting stack.
+        '''
+        record = self.manager._build_hand_record(self.terminal_state, 3, 'Bot', False, 149)
+        self.assertEqual((record.player_delta, record.winner), (-1, 1))
+
+    def test_incomplete_hands_not_recorded(self):
+        '''
+        A delta contradicting the winner, or a hand without its full action list, yields no record.
+        '''
+        self.assertIsNone(self.manager._build_hand_record(self.terminal_state, 3, 'Player', False, 149))
+        self.manager.hand_actions = None
+        self.assertIsNone(self.manager._build_hand_record(self.terminal_state, 3, 'Bot', False, 149))
+
+    def test_state_keeps_actions(self):
+        '''
+        The stored state, plain or packed, carries the hand's actions and start stacks without the event log.
+        '''
+        _, round_state = deal(1)
+        state = self.manager._serialize_game_state(round_state)
+        for stored in (state, decode_game_state(encode_game_state(state))):
+            manager = PokerGameManager(self.manager.session)
+            manager._deserialize_game_state(stored)
+            self.assertEqual((manager.hand_actions, manager.hand_start_stacks), ([(0, 0)], [150, 250]))
+
+    def test_missing_actions_stay_missing(self):
+        '''
+        A state stored without an action list, like a legacy JSON state, still has none after packing.
+        '''
+        _, round_state = deal(1)
+        self.manager.hand_actions = None
+        state = decode_game_state(encode_game_state(self.manager._serialize_game_state(round_state)))
+        self.assertNotIn('actions', state)
+        self.manager._deserialize_game_state(state)
+        self.assertIsNone(self.manager.hand_actions)
+
+class TakeoverTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='player', email='player@example.com', coins=1000)
+        self.session = GameSession.objects.create(player=self.user, current_street='preflop')
+        manager = PokerGameManager(self.session)
+        manager.process_buy_in()
+        response = manager.start_new_hand()
+        while not response.get('bot_pending'):
+            response = manager.process_player_action('call' if 'call' in response['legal_actions'] else 'check', defer_bot=True)
+
+    def test_original_worker_loses_claim(self):
+        '''
+        A takeover moves the claim forward, so the slow original worker's move is not written.
+        '''
+        original = PokerGameManager(GameSession.objects.get(pk=self.session.pk))
+        runner = BotMoveRunner(max_workers=1, timeout=0)
+        submitted = []
+        runner.submit = lambda session_id, player: submitted.append(session_id)
+        self.assertEqual(runner.poll(self.session.pk, self.user), {'bot_pending': True})
+        self.assertEqual(submitted, [str(self.session.pk)])
+        with self.assertRaises(StaleSessionError):
+            original.process_bot_action()
+        self.assertIsNone(GameSession.objects.get(pk=self.session.pk).bot_move_result)
+
+class SpeculationTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='player', email='player@example.com', coins=1000)
+        self.manager = PokerGameManager(GameSession.objects.create(player=self.user, current_street='preflop'))
+        # The flop, checked through preflop, with the human to act
+        seed = 0
+        while True:
+            _, round_state = deal(seed)
+            round_state = round_state.proceed(CallAction()).proceed(CheckAction())
+            if round_state.button % 2 == 0:
+                break
+            seed += 1
+        self.round_state = round_state
+        self.speculator = BotSpeculator(workers=1, budget=60)
+
+    def test_branch_bot_becomes_live_bot(self):
+        '''
+        Each branch decides on its own copy of the bot, and a hit installs that copy as the live bot.
+        '''
+        live_bot = self.manager.rebel_bot
+        session_id = self.manager.session.session_id
+        self.speculator.speculate(session_id, self.round_state, live_bot).result()
+        branch_bots = [bot for _, bot in self.speculator._branches[str(session_id)].values()]
+        self.assertEqual(len(set(map(id, branch_bots))), len(branch_bots))
+        with mock.patch('apps.poker.game_manager.bot_speculator', self.speculator):
+            action = self.manager._speculated_action(self.round_state.proceed(CheckAction()))
+        self.assertIsNotNone(action)
+        self.assertIsNot(self.manager.rebel_bot, live_bot)
+        self.assertTrue(any(bot is self.manager.rebel_bot for bot in branch_bots))
+
+    def test_belief_survives_speculated_reply(self):
+        '''
+        The own-range update and solver node of a speculated postflop reply stay on the live bot,
+        as they would had the bot decided during the request.
+        '''
+        session_id = self.manager.session.session_id
+        self.speculator.speculate(session_id, self.round_state, self.manager.rebel_bot).result()
+        next_state = self.round_state.proceed(CheckAction())
+        with mock.patch('apps.poker.game_manager.bot_speculator', self.speculator):
+            action = self.manager._speculated_action(next_state)
+        bot = self.manager.rebel_bot
+        solver, node = bot.belief_node
+        self.assertIs(node, solver.root.children[solver.match_action(solver.root, action)])
+        self.assertEqual(bot.belief_hand, tuple(next_state.hands[1]))
+        uniform = bot.get_public_state(next_state, 1).ranges
+        self.assertFalse(np.allclose(bot.public_belief.ranges[1], uniform[1]))
+        np.testing.assert_allclose(bot.public_belief.ranges[0], uniform[0])
+
+class DealTests(TestCase):
+    def test_unseeded_hand_drops_old_seed(self):
+        '''
+        A hand dealt without a seed after a seeded one is stored with its own cards, not the old seed.
+        '''
+        user = CustomUser.objects.create(username='player', email='player@example.com', coins=1000)
+        manager = PokerGameManager(GameSession.objects.create(player=user, current_street='preflop'))
+        manager.process_buy_in()
+        manager.start_new_hand()
+        self.assertIsNotNone(manager.deck_seed)
+        manager.settings.SEEDED_DECK = False
+        manager.start_new_hand(True)
+        self.assertIsNone(manager.deck_seed)
+        state = manager._load_game_state()
+        self.assertNotIn('deck_seed', state)
+        self.assertEqual(state['hands'][0], manager.session.player_cards)
+
+class StrengthCacheTests(SimpleTestCase):
+    def test_samples_accumulate_across_street(self):
+        '''
+        Without the solver, a second decision on the same flop continues from the first one's samples,
+        and a new board starts over.
+        '''
+        bot = ReBeL()
+        bot.use_solver = False
+        _, round_state = deal(0)
+        flop = round_state.proceed(CallAction()).proceed(CheckAction())
+        active = flop.button % 2
+        bot.get_action(None, flop, active)
+        first_iters = bot.strength_cache[3]
+        self.assertEqual(first_iters, bot.strength_iters)
+        bot.get_action(None, flop.proceed(RaiseAction(flop.raise_bounds()[0])).proceed(RaiseAction(flop.raise_bounds()[0] * 3)), active)
+        self.assertEqual(bot.strength_cache[3], first_iters + bot.strength_batch)
+        turn = flop.proceed(CheckAction()).proceed(CheckAction())
+        bot.get_action(None, turn, turn.button % 2)
+        self.assertEqual(bot.strength_cache[1], tuple(turn.deck[:4]))
+        self.assertEqual(bot.strength_cache[3], bot.strength_iters)
+
+class SlowBot:
+    def __init__(self, delay):
+        self.delay = delay
+        self.decisions = []  # cancellation events of every decision, shared with the bot's copies
+
+    def get_action_by(self, game_state, round_state, active, deadline, cancelled=None):
+        self.decisions.append(cancelled)
+        cancelled.wait(self.delay)
+        return CallAction()
+
+class DeadlineTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='player', email='player@example.com', coins=1000)
+        self.manager = PokerGameManager(GameSession.objects.create(player=self.user, current_street='preflop'))
+        self.manager.settings.BOT_ACTION_BUDGET = 0.05
+        self.manager.settings.BOT_ACTION_GRACE = 0.05
+        _, self.round_state = deal(0)
+
+    def test_decision_in_time_is_kept(self):
+        '''
+        A decision within the deadline is played, and the copy of the bot that made it becomes the live bot.
+        '''
+        slow_bot = self.manager.rebel_bot = SlowBot(0)
+        self.assertIsInstance(self.manager._timed_bot_action(None, self.round_state), CallAction)
+        self.assertIsNot(self.manager.rebel_bot, slow_bot)
+
+    def test_missed_deadline_checks_or_folds(self):
+        '''
+        A decision past the deadline is cancelled: the bot folds facing a bet, checks otherwise, and stays as it was.
+        '''
+        slow_bot = self.manager.rebel_bot = SlowBot(5)
+        with self.assertLogs('apps.poker.game_manager', 'WARNING'):
+            self.assertIsInstance(self.manager._timed_bot_action(None, self.round_state), FoldAction)
+        self.assertTrue(slow_bot.decisions[0].is_set())
+        self.assertIsInstance(self.manager._timed_bot_action(None, self.round_state.proceed(CallAction())), CheckAction)
+        self.assertIs(self.manager.rebel_bot, slow_bot)
+
+class HandRecordWriterTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='player', email='player@example.com', coins=1000)
+        self.session = GameSession.objects.create(player=self.user, current_street='preflop')
+
+    def writer(self, **options):
+        writer = HandRecordWriter(batch_size=10, **options)
+        writer._thread = True  # flushed by the test, never by a writer thread
+        return writer
+
+    def record(self, hand, player_delta=1):
+        return HandRecord(session=self.session, hand=hand, button=0, cards=bytes(9), street=0, actions=b'',
+                          pot=3, player_delta=player_delta, winner=0)
+
+    def test_bad_record_does_not_block_batch(self):
+        '''
+        A record the database rejects is retried alone and dropped after max_attempts, while the rest are written.
+        '''
+        writer = self.writer(max_attempts=2)
+        for hand in range(3):
+            writer.add(self.record(hand, None if hand == 1 else 1))
+        with self.assertLogs('apps.poker.hand_records', 'WARNING'):
+            self.assertEqual(writer.flush(), 2)
+        self.assertEqual(len(writer), 1)
+        writer.add(self.record(3))
+        with self.assertLogs('apps.poker.hand_records', 'ERROR'):
+            self.assertEqual(writer.flush(), 1)
+        self.assertEqual((len(writer), writer.dropped), (0, 1))
+        self.assertEqual(list(HandRecord.objects.values_list('hand', flat=True)), [0, 2, 3])
+
+    def test_buffer_is_capped(self):
+        '''
+        Past max_buffer records the oldest are dropped.
+        '''
+        writer = self.writer(max_buffer=3)
+        with self.assertLogs('apps.poker.hand_records', 'ERROR'):
+            for hand in range(5):
+                writer.add(self.record(hand))
+        self.assertEqual([record.hand for record, _ in writer._buffer], [2, 3, 4])
+        self.assertEqual(writer.dropped, 2)
+
+class StateCodecTests(TestCase):
+    HANDS = 100
+
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='player', email='player@example.com', coins=1000)
+        self.session = GameSession.objects.create(player=self.user, current_street='preflop')
+        self.manager = PokerGameManager(self.session)
+
+    def test_round_trip(self):
+        '''
+        Every state along random hands, live or terminal, seeded or not, packs and unpacks to the same dict.
+        '''
+        rng = random.Random(0)
+        for seed in range(self.HANDS):
+            _, round_state = deal(seed)
+            self.manager.deck_seed = seed if seed % 2 else None
+            self.manager.hand_types = ['Pair', 'Flush']
+            self.manager.hand_start_stacks = [200, 200]
+            self.manager.hand_actions = [] if seed % 3 else None
+            while True:
+                state = self.manager._serialize_game_state(round_state)
+                # An unset optional field (deal() leaves outcome unset) unpacks as absent, which readers treat alike
+                expected = {key: value for key, value in state.items() if value is not None or key == 'deltas'}
+                with self.subTest(seed=seed, state=state):
+                    self.assertEqual(decode_game_state(encode_game_state(state)), expected)
+                if isinstance(round_state, TerminalState):
+                    break
+                action = random_action(rng, round_state)
+                if self.manager.hand_actions is not None:
+                    self.manager.hand_actions.append((round_state.button % 2, ACTION_CODES[type(action)]))
+                round_state = round_state.proceed(action)
+
+    def test_legacy_json_state_migrates(self):
+        '''
+        A JSON game state saved before the codec is packed by migration 0008, reads back unchanged,
+        and loads as a hand whose actions and start stacks are unknown.
+        '''
+        _, round_state = deal(0)
+        legacy = {
+            'terminal': False, 'button': 0, 'street': 0, 'final_street': 5, 'pips': [1, 2], 'stacks': [199, 198],
+            'outcome': 1, 'zobrist': round_state.zobrist, 'hand_types': ['Pair', 'High Card'], 'total_pot': 0,
+            'hands': [['As', 'Kd'], ['7c', '2h']], 'deck': ['Qs', 'Jh', '9d', '4c', '3s'],
+        }
+        GameSession.objects.filter(pk=self.session.pk).update(game_state=legacy, game_state_data=b'')
+        migration = importlib.import_module('apps.poker.migrations.0008_gamesession_game_state_data')
+        migration.encode_json_states(apps, None)
+        session = GameSession.objects.get(pk=self.session.pk)
+        self.assertEqual(session.game_state, {})
+        self.assertEqual(bytes(session.game_state_data)[0], 1)
+        self.assertEqual(session.load_game_state(), legacy)
+        manager = PokerGameManager(session)
+        manager._deserialize_game_state(manager._load_game_state())
+        self.assertEqual((manager.hand_actions, manager.hand_start_stacks), (None, None))
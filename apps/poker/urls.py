@@ -14,6 +14,7 @@ urlpatterns = [
     
     # Existing URLs
     path('make_move/', views.make_move, name='make_move'),
+    path('bot_move/', views.bot_move, name='bot_move'),
     path('start_hand/', views.start_hand, name='start_hand'),
     path('dev/', views.staking_view, name='dev'),
     path('buy_in/', views.buy_in, name='buy_in'),
@@ -3,7 +3,11 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from .models import GameSession, AvailableGame, BotRepository
-from .game_manager import PokerGameManager
+from .manager_cache import manager_cache
+from .game_manager import StaleSessionError
+from .bot_moves import bot_move_runner
+from .speculation import bot_speculator
+from .config import PokerSettings
 import json
 from .forms import JoinGameForm, CreateGameForm
 from django.conf import settings
@@ -192,15 +196,20 @@ def initialize_game(request):
     except GameSession.DoesNotExist:
         return redirect('poker:game')
     
+def stale_session_response():
+    # Another request for the same session wrote first; its manager was dropped, so a retry reloads
+    return JsonResponse({'error': 'The game changed in another request, please retry'}, status=409)
+
 def start_hand(request):
     if request.method == 'POST':
         data = json.loads(request.body)
-        session = GameSession.objects.get(session_id=data.get('session_id'), player=request.user)
-        game_manager = PokerGameManager(session)
-        
-        # Pass continue_session flag to start_new_hand
-        continue_session = data.get('continue_session', False)
-        response_data = game_manager.start_new_hand(continue_session)
+        try:
+            with manager_cache.checkout(data.get('session_id'), request.user) as game_manager:
+                # Pass continue_session flag to start_new_hand
+                continue_session = data.get('continue_session', False)
+                response_data = game_manager.start_new_hand(continue_session)
+        except StaleSessionError:
+            return stale_session_response()
         
         return JsonResponse(response_data)
     
@@ -209,30 +218,41 @@ def start_hand(request):
 def make_move(request):
     if request.method == 'POST':
         data = json.loads(request.body)
-        session = GameSession.objects.get(session_id=data.get('session_id'), player=request.user)
-        game_manager = PokerGameManager(session)
-        
-        response_data = game_manager.process_player_action(
-            data.get('action'),
-            data.get('amount', 0)
-        )
+        try:
+            with manager_cache.checkout(data.get('session_id'), request.user) as game_manager:
+                response_data = game_manager.process_player_action(
+                    data.get('action'),
+                    data.get('amount', 0),
+                    defer_bot=PokerSettings.ASYNC_BOT_MOVES
+                )
+        except StaleSessionError:
+            return stale_session_response()
+        # The bot answers in the background; the client polls bot_move/ for its move
+        if response_data.get('bot_pending'):
+            bot_move_runner.submit(data.get('session_id'), request.user)
         
         return JsonResponse(response_data)
     
     return JsonResponse({'error': 'Invalid request'}, status=400)
 
+def bot_move(request):
+    if request.method == 'POST':
+        data = json.loads(request.body)
+        return JsonResponse(bot_move_runner.poll(data.get('session_id'), request.user))
+    
+    return JsonResponse({'error': 'Invalid request'}, status=400)
+
 @login_required
 def buy_in(request):
     if request.method != 'POST':
         return JsonResponse({'success': False, 'message': 'Invalid request method'})
     
     data = json.loads(request.body)
-    session = GameSession.objects.get(
-        session_id=data.get('session_id'),
-        player=request.user
-    )
-    game_manager = PokerGameManager(session)
-    success, message = game_manager.process_buy_in()
+    try:
+        with manager_cache.checkout(data.get('session_id'), request.user) as game_manager:
+            success, message = game_manager.process_buy_in()
+    except StaleSessionError:
+        return stale_session_response()
     
     if success:
         # Get the updated user object to ensure we have the latest coin balance
@@ -253,15 +273,16 @@ def exit_game(request):
     if request.method != 'POST':
         return JsonResponse({'success': False, 'message': 'Invalid request method'}) 
     data = json.loads(request.body)
-    session = GameSession.objects.get(
-        session_id=data.get('session_id'),
-        player=request.user
-    )
     # Create game manager with the correct player instance
-    game_manager = PokerGameManager(session)
-    
-    # Process the exit and get remaining coins
-    remaining_coins = game_manager.process_exit_game()
+    try:
+        with manager_cache.checkout(data.get('session_id'), request.user) as game_manager:
+            # Process the exit and get remaining coins
+            remaining_coins = game_manager.process_exit_game()
+    except StaleSessionError:
+        return stale_session_response()
+    # The session is over, so its live manager is no longer needed
+    manager_cache.discard(data.get('session_id'))
+    bot_speculator.discard(data.get('session_id'))
     
     # Get the updated coin balance
     updated_balance = request.user.coins
@@ -0,0 +1,106 @@
+# poker/zobrist.py
+'''
+64-bit Zobrist keys for poker game states.
+
+A state's hash is the XOR of keys for its starting position, every action
+taken since (keyed by street, button count and action code), its current
+stacks, street and visible board cards. Each step changes only a few of
+those terms, so states update their hash in O(1) per action. Private cards
+are left out and can be mixed in with private_hash.
+
+Keys come from splitmix64 over fixed domain tags, so hashes are identical
+across processes and runs and can key persistent or shared caches.
+'''
+from .cards import NUM_CARDS
+
+MASK64 = (1 << 64) - 1
+# Stacks above this fall back to computing their key on the fly
+MAX_TABLE_STACK = 1023
+
+_ROOT_TAG, _ACTION_TAG, _STACK_TAG, _STREET_TAG, _BOARD_TAG, _HOLE_TAG = range(1, 7)
+
+def splitmix64(x):
+    '''
+    Mixes a 64-bit integer into a well-distributed 64-bit key.
+    '''
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+def _key(tag, *fields):
+    value = tag
+    for field in fields:
+        value = (value << 16) | field
+    return splitmix64(value)
+
+STREET_KEYS = tuple(_key(_STREET_TAG, street) for street in range(6))
+BOARD_KEYS = tuple(_key(_BOARD_TAG, card) for card in range(NUM_CARDS))
+HOLE_KEYS = tuple(tuple(_key(_HOLE_TAG, player, card) for card in range(NUM_CARDS)) for player in range(2))
+STACK_KEYS = tuple(tuple(_key(_STACK_TAG, player, stack) for stack in range(MAX_TABLE_STACK + 1)) for player in range(2))
+
+# Action keys are generated on first use and memoized by a packed int
+ACTION_KEY_CACHE_SIZE = 1 << 16
+_action_keys = {}
+
+def action_key(street, button, code):
+    '''
+    Returns the key of an action code taken at this street and button count.
+    The (street, button) pair identifies the action's position within the hand.
+    '''
+    packed = (street << 32) | (button << 16) | code
+    key = _action_keys.get(packed)
+    if key is None:
+        if len(_action_keys) >= ACTION_KEY_CACHE_SIZE:
+            _action_keys.clear()
+        key = _action_keys[packed] = _key(_ACTION_TAG, street, button, code)
+    return key
+
+def stack_key(player, stack):
+    '''
+    Returns the key of a player's stack size.
+    '''
+    if 0 <= stack <= MAX_TABLE_STACK:
+        return STACK_KEYS[player][stack]
+    return _key(_STACK_TAG, player, stack & 0xFFFF)
+
+def board_hash(cards):
+    '''
+    XORs the keys of a set of board cards.
+    '''
+    h = 0
+    for card in cards:
+        h ^= BOARD_KEYS[card]
+    return h
+
+def root_hash(button, street, stacks, board):
+    '''
+    Hashes a state from scratch; used for the first state of a hand or of a search.
+    '''
+    return (_key(_ROOT_TAG, button, street) ^ STREET_KEYS[street] ^ stack_key(0, stacks[0])
+            ^ stack_key(1, stacks[1]) ^ board_hash(board))
+
+def step_hash(zobrist, street, button, code, old_stacks, new_stacks):
+    '''
+    Updates a hash for one action taken at (street, button) that moved stacks from old to new.
+    '''
+    zobrist ^= action_key(street, button, code)
+    for player in (0, 1):
+        if old_stacks[player] != new_stacks[player]:
+            zobrist ^= stack_key(player, old_stacks[player]) ^ stack_key(player, new_stacks[player])
+    return zobrist
+
+def street_hash(zobrist, old_street, new_street, deck):
+    '''
+    Updates a hash for a new street, revealing deck[old_street:new_street].
+    '''
+    return zobrist ^ STREET_KEYS[old_street] ^ STREET_KEYS[new_street] ^ board_hash(deck[old_street:new_street])
+
+def private_hash(zobrist, hands, player=None):
+    '''
+    Mixes one player's hole cards (or both with player=None) into a public hash.
+    '''
+    for seat in ((0, 1) if player is None else (player,)):
+        for card in hands[seat]:
+            zobrist ^= HOLE_KEYS[seat][card]
+    return zobrist
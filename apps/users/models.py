@@ -71,19 +71,21 @@ class CustomUser(AbstractUser):
         
         return min((gems_progress / gems_needed) * 100, 100)
 
-    def add_coins(self, amount):
+    def add_coins(self, amount, save=True):
         if amount < 0:
             raise ValueError("Cannot add negative coins")
         self.coins += amount
-        self.save()
+        if save:
+            self.save()
 
-    def remove_coins(self, amount):
+    def remove_coins(self, amount, save=True):
         if amount < 0:
             raise ValueError("Cannot remove negative coins")
         if self.coins < amount:
             raise ValueError("Not enough coins")
         self.coins -= amount
-        self.save()
+        if save:
+            self.save()
 
     def __str__(self):
         return self.username
\ No newline at end of file
@@ -39,6 +39,12 @@ class API {
         });
     }
 
+    static async botMove(sessionId) {
+        return this.makeRequest('/bot_move/', {
+            session_id: sessionId
+        });
+    }
+
     static async exitGame(sessionId) {
         return this.makeRequest('/exit_game/', {
             session_id: sessionId
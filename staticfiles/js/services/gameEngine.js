@@ -81,9 +81,16 @@ class GameEngine {
             const amount = action === 'raise' ? 
                 parseInt(this.raiseInput.value) : 0;
             
-            const data = await API.makeMove(this.sessionId, action, amount);
+            let data = await API.makeMove(this.sessionId, action, amount);
             this.updateGameState(data);
             
+            if (data.bot_pending) {
+                this.enableGameButtons(false);
+                data = await this.waitForBot();
+                this.updateGameState(data);
+                this.enableGameButtons(true);
+            }
+            
             if (data.hand_complete) {
                 this.handleHandComplete();
             }
@@ -92,6 +99,17 @@ class GameEngine {
         }
     }
 
+    async waitForBot() {
+        // The bot moves in the background; poll until its response is ready
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, CONSTANTS.GAME_CONFIG.BOT_POLL_INTERVAL));
+            const data = await API.botMove(this.sessionId);
+            if (!data.bot_pending) {
+                return data;
+            }
+        }
+    }
+
     async exitGame() {
         if (this.gameInProgress) {
             if (!confirm(CONSTANTS.EXIT_CONFIRMATION_MESSAGE)) {
@@ -13,6 +13,7 @@ export const CONSTANTS = {
     ENDPOINTS: {
         START_HAND: '/start_hand/',
         MAKE_MOVE: '/make_move/',
+        BOT_MOVE: '/bot_move/',
         EXIT_GAME: '/exit_game/',
         BUY_IN: '/buy_in/'
     },
@@ -20,7 +21,8 @@ export const CONSTANTS = {
     GAME_CONFIG: {
         INITIAL_BUYIN: 200,
         MIN_BET: 1,
-        MAX_BET: 200
+        MAX_BET: 200,
+        BOT_POLL_INTERVAL: 250
     }
 };
 